@@ -0,0 +1,171 @@
+import os
+import sys
+import argparse
+import pygame
+
+
+"""
+Lazy asset registry.
+
+Nothing is loaded at import. Images are loaded (and scale2x'd) the first time something is drawn, and
+converted to the display's pixel format once a display exists, so blits are fast. The font is made on
+first use too.
+
+The simulation never needs the pictures, only sprite sizes and collision masks, and those come from
+sprite_data.py (precomputed from imgs/), so headless training / worker processes do no image I/O at all.
+`python assets.py` checks the committed sizes + masks against pygame.mask.from_surface on the real images
+(without touching anything). After changing anything in imgs/, run `python assets.py --regenerate` to
+rewrite sprite_data.py.
+
+rotated(name, tilt) caches rotated sprites. Bird tilt only ever takes a few values (MAX_ROTATION 25, then
+down in steps of ROT_VEL 20 to below -90), so with 3 animation frames that's a few dozen surfaces total
+instead of a pygame.transform.rotate per bird per frame. When a sprite gets converted to the display format,
+its cached rotations are dropped, so ones made before the display existed get remade from the converted image.
+"""
+
+
+IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imgs")
+FILES = {       #name -> file in imgs/; pipe_top is the pipe flipped upside down
+    "bird1": "bird1.png",
+    "bird2": "bird2.png",
+    "bird3": "bird3.png",
+    "pipe": "pipe.png",
+    "pipe_top": "pipe.png",
+    "base": "base.png",
+    "bg": "bg.png",
+}
+BIRD_FRAMES = ["bird1", "bird2", "bird3"]
+MASKED = ["bird1", "bird2", "bird3", "pipe", "pipe_top"]        #sprites that need collision masks
+
+_images = {}            #name -> surface
+_converted = set()      #names already converted to the display format
+_masks = {}             #name -> pygame.mask.Mask
+_rotated = {}           #(name, tilt) -> surface
+_runs = {}              #run length -> 1 pixel high filled mask (for building masks from sprite_data)
+_font = None
+
+
+def _load(name):
+    img = pygame.transform.scale2x(pygame.image.load(os.path.join(IMG_DIR, FILES[name])))
+    if name == "pipe_top":
+        img = pygame.transform.flip(img, False, True)
+    return img
+
+
+def image(name):        #surface for name, loaded on first use, in display format once there's a display
+    img = _images.get(name)
+    if img is None:
+        img = _images[name] = _load(name)
+    if name not in _converted and pygame.display.get_surface() is not None:
+        img = _images[name] = img.convert_alpha()
+        _converted.add(name)
+        for key in [key for key in _rotated if key[0] == name]:     #rotated before there was a display, so still in the old format
+            del _rotated[key]
+    return img
+
+
+def rotated(name, tilt):        #image(name) rotated by tilt degrees, made once per (sprite, tilt)
+    key = (name, tilt)
+    src = image(name)       #first, so a conversion happening now drops the stale rotations before the lookup
+    img = _rotated.get(key)
+    if img is None:
+        img = _rotated[key] = pygame.transform.rotate(src, tilt)
+    return img
+
+
+def font():
+    global _font
+    if _font is None:
+        pygame.font.init()
+        _font = pygame.font.SysFont("comicsans", 50)
+    return _font
+
+
+def size(name):     #(width, height) without loading anything
+    import sprite_data
+    return sprite_data.SIZES[name]
+
+
+def mask(name):     #collision mask built from sprite_data (no image I/O)
+    m = _masks.get(name)
+    if m is None:
+        import sprite_data
+        m = pygame.mask.Mask(sprite_data.SIZES[name])
+        y = 0
+        for count, runs in sprite_data.MASKS[name]:
+            for _ in range(count):
+                for x, n in runs:
+                    run = _runs.get(n)
+                    if run is None:
+                        run = _runs[n] = pygame.mask.Mask((n, 1), fill=True)
+                    m.draw(run, (x, y))
+                y += 1
+        _masks[name] = m
+    return m
+
+
+def _mask_rows(m):      #[(count, ((x, length), ...))]: solid runs per row, identical rows in a row merged
+    w, h = m.get_size()
+    rows = []
+    for y in range(h):
+        runs = []
+        x = 0
+        while x < w:
+            if m.get_at((x, y)):
+                start = x
+                while x < w and m.get_at((x, y)):
+                    x += 1
+                runs.append((start, x - start))
+            else:
+                x += 1
+        runs = tuple(runs)
+        if rows and rows[-1][1] == runs:
+            rows[-1][0] += 1
+        else:
+            rows.append([1, runs])
+    return [tuple(r) for r in rows]
+
+
+def regenerate(path=None):      #rewrite sprite_data.py from the images in imgs/
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "sprite_data.py")
+    lines = ["#Generated by `python assets.py --regenerate` from imgs/ (scaled 2x) - don't edit by hand",
+             "#Sprite sizes + collision masks, so the simulation never has to load images",
+             "", "SIZES = {"]
+    for name in FILES:
+        lines.append("    {!r}: {!r},".format(name, _load(name).get_size()))
+    lines += ["}", "", "#per sprite: [(number of identical rows, ((x, run length), ...)), ...] from the top row down", "MASKS = {"]
+    for name in MASKED:
+        lines.append("    {!r}: [".format(name))
+        for row in _mask_rows(pygame.mask.from_surface(_load(name))):
+            lines.append("        {!r},".format(row))
+        lines.append("    ],")
+    lines.append("}")
+    with open(path, "w", newline="\r\n") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def verify():       #names whose precomputed mask/size doesn't match the real image
+    bad = []
+    for name in FILES:
+        img = _load(name)
+        if size(name) != img.get_size():
+            bad.append(name)
+        elif name in MASKED:
+            real = pygame.mask.from_surface(img)
+            if real.overlap_area(mask(name), (0, 0)) != real.count() or real.count() != mask(name).count():
+                bad.append(name)
+    return bad
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check sprite_data.py against imgs/ (or regenerate it)")
+    parser.add_argument("--regenerate", action="store_true", help="rewrite sprite_data.py from imgs/ first")
+    args = parser.parse_args()
+    if args.regenerate:
+        regenerate()
+        _masks.clear()
+        sys.modules.pop("sprite_data", None)        #check the new file, not what was imported before
+        print("sprite_data.py regenerated")
+    bad = verify()
+    print("sprite_data.py vs imgs/: mismatches: {}".format(", ".join(bad) or "none"))
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,167 @@
+import sys
+import random
+import numpy as np
+import neat
+from neat.activations import tanh_activation
+from neat.aggregations import sum_aggregation
+
+
+"""
+Batched inference for a whole population: one numpy pass per frame instead of one
+FeedForwardNetwork.activate call per bird.
+
+Once per generation, every bird's network (made by neat.nn.FeedForwardNetwork.create as usual) is packed
+into flat arrays. Each net gets a row of node "slots" (inputs first, then its nodes), and nodes are grouped
+by depth (longest path from an input), so all nodes at one depth - across every net - are computed together:
+    value = tanh(bias + response * sum(weight * value of source))
+with the same 2.5x scaling + clamp as neat's tanh_activation, and sums added up in the same order as
+FeedForwardNetwork, so outputs match the per-bird path to float rounding.
+
+activate(inputs, rows) runs only the nets picked by a bool mask (birds alive + due for a decision), so
+frames where decisions.py holds most birds cost about as much as the birds actually asked.
+
+Only tanh activation + sum aggregation are supported (that's all config-feedforward.txt allows).
+
+python batchnet.py (and tests/test_batchnet.py) checks it against FeedForwardNetwork.activate on mutated random genomes.
+"""
+
+
+class BatchNetwork:
+    def __init__(self, nets):
+        self.n = len(nets)
+        n_inputs = len(nets[0].input_nodes) if nets else 0
+        n_outputs = len(nets[0].output_nodes) if nets else 0
+
+        #give every node in every net a slot; inputs always take slots 0..n_inputs-1
+        slot_maps = []
+        depths = []
+        for net in nets:
+            slots = {k: i for i, k in enumerate(net.input_nodes)}
+            depth = {k: 0 for k in net.input_nodes}
+            for node, act_func, agg_func, bias, response, links in net.node_evals:
+                if act_func is not tanh_activation or agg_func is not sum_aggregation:
+                    raise ValueError("BatchNetwork only supports tanh activation with sum aggregation")
+                slots[node] = len(slots)
+                depth[node] = 1 + max((depth[i] for i, _ in links), default=0)
+            for k in net.output_nodes:      #outputs w/ no path from the inputs never get computed, stay 0.0
+                slots.setdefault(k, len(slots))
+            slot_maps.append(slots)
+            depths.append(depth)
+
+        self.width = max((len(s) for s in slot_maps), default=n_inputs)
+        self.n_inputs = n_inputs
+        self.values = np.zeros((self.n, self.width))
+
+        #group every net's nodes by depth, keeping node_evals order inside each net (so sums add in the same order)
+        levels = {}
+        for b, net in enumerate(nets):
+            slots = slot_maps[b]
+            base = b * self.width
+            for node, _, _, bias, response, links in net.node_evals:
+                level = levels.setdefault(depths[b][node], ([], [], [], [], [], []))
+                dst, biases, responses, src, weights, seg = level
+                for i, w in links:
+                    src.append(base + slots[i])
+                    weights.append(w)
+                    seg.append(len(dst))
+                dst.append(base + slots[node])
+                biases.append(bias)
+                responses.append(response)
+
+        self.levels = []
+        for d in sorted(levels):
+            dst, biases, responses, src, weights, seg = levels[d]
+            self.levels.append((np.array(dst, dtype=np.int64), np.array(biases), np.array(responses),
+                                np.array(src, dtype=np.int64), np.array(weights), np.array(seg, dtype=np.int64)))
+
+        #the same levels laid end to end, for picking out some nets' nodes + links in one go (activate w/ rows)
+        parts = list(zip(*self.levels)) or [[np.zeros(0, dtype=np.int64)]] * 6
+        self.node_bounds = np.cumsum([0] + [len(level[0]) for level in self.levels])
+        self.link_bounds = np.cumsum([0] + [len(level[3]) for level in self.levels])
+        self.all_dst, self.all_bias, self.all_response, self.all_src, self.all_weights = (np.concatenate(p) for p in parts[:5])
+        self.all_seg = np.concatenate([seg + start for seg, start in zip(parts[5], self.node_bounds)])     #index into all_dst
+        self.all_net = self.all_dst // max(self.width, 1)      #which net each node is in
+
+        self.output_slots = np.array([[s[k] for k in net.output_nodes] for s, net in zip(slot_maps, nets)],
+                                     dtype=np.int64).reshape(self.n, n_outputs)
+
+    @classmethod
+    def from_genomes(cls, genomes, config):       #genomes is a list of genome objects
+        return cls([neat.nn.FeedForwardNetwork.create(g, config) for g in genomes])
+
+    def activate(self, inputs, rows=None):      #inputs: (n, n_inputs) array, one row per net; returns (n, n_outputs) array
+        if rows is not None:        #only the nets picked by the bool mask rows: one input row each, one output row each
+            return self.activate_rows(inputs, rows)
+        values = self.values
+        values[:, :self.n_inputs] = inputs
+        flat = values.reshape(-1)
+        for dst, bias, response, src, weights, seg in self.levels:
+            s = np.bincount(seg, weights=flat[src] * weights, minlength=len(dst))
+            flat[dst] = np.tanh(np.clip(2.5 * (bias + response * s), -60.0, 60.0))
+        return np.take_along_axis(values, self.output_slots, axis=1)
+
+    def activate_rows(self, inputs, rows):      #same sums as activate, but only the picked nets' nodes + links; the rest keep stale values nobody reads
+        values = self.values
+        values[rows, :self.n_inputs] = inputs
+        flat = values.reshape(-1)
+        keep = rows[self.all_net]
+        nodes = np.flatnonzero(keep)
+        links = np.flatnonzero(keep[self.all_seg])      #a link belongs to the net its node is in
+        node_bounds = np.searchsorted(nodes, self.node_bounds)
+        link_bounds = np.searchsorted(links, self.link_bounds)
+        dst, bias, response = self.all_dst[nodes], self.all_bias[nodes], self.all_response[nodes]
+        src, weights = self.all_src[links], self.all_weights[links]
+        seg = (np.cumsum(keep) - 1)[self.all_seg[links]]        #renumbered to index into the picked nodes
+        for k in range(len(self.levels)):
+            a, b = node_bounds[k], node_bounds[k + 1]
+            c, d = link_bounds[k], link_bounds[k + 1]
+            if a == b:
+                continue
+            s = np.bincount(seg[c:d] - a, weights=flat[src[c:d]] * weights[c:d], minlength=b - a)
+            flat[dst[a:b]] = np.tanh(np.clip(2.5 * (bias[a:b] + response[a:b] * s), -60.0, 60.0))
+        return np.take_along_axis(values[rows], self.output_slots[rows], axis=1)
+
+
+def batch_policy(batch_net):        #world.World policy: jump if the (first) output > 0.5, like main.play
+    def policy(inputs, alive):      #only birds being asked get their nets run: not dead ones, not ones decisions.py is holding
+        if alive.all():
+            return batch_net.activate(inputs)[:, 0] > 0.5
+        out = np.zeros(len(alive), dtype=bool)
+        if alive.any():
+            out[alive] = batch_net.activate(inputs[alive], alive)[:, 0] > 0.5
+        return out
+    return policy
+
+
+def verify(genomes, config, inputs, tol=1e-9):      #compare BatchNetwork vs FeedForwardNetwork on rows of inputs; returns (max abs diff, # different jump decisions)
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    batch_net = BatchNetwork(nets)
+    max_diff = 0.0
+    mismatches = 0
+    picked = np.arange(len(nets)) % 3 == 0      #also run every third net on its own (the others still hold the last row's values)
+    for row in inputs:
+        some = batch_net.activate(np.tile(row, (picked.sum(), 1)), picked)
+        batch = batch_net.activate(np.tile(row, (len(nets), 1)))
+        if picked.any():
+            max_diff = max(max_diff, float(np.max(np.abs(some - batch[picked]))))
+        for b, net in enumerate(nets):
+            expected = net.activate(tuple(row))
+            max_diff = max(max_diff, float(np.max(np.abs(batch[b] - expected))))
+            if (batch[b][0] > 0.5) != (expected[0] > 0.5) and abs(expected[0] - 0.5) > tol:
+                mismatches += 1
+    return max_diff, mismatches
+
+
+if __name__ == "__main__":      #self check on a population of mutated random genomes
+    random.seed(0)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, "config-feedforward.txt")
+    genomes = list(neat.Population(config).population.values())
+    for g in genomes:       #grow some hidden nodes/connections so topologies differ
+        for _ in range(random.randrange(20)):
+            g.mutate(config.genome_config)
+
+    inputs = [(random.uniform(0, 730), random.uniform(0, 500), random.uniform(0, 500)) for _ in range(200)]
+    max_diff, mismatches = verify(genomes, config, inputs)
+    print("max abs diff: {:.3e}, jump decision mismatches: {}".format(max_diff, mismatches))
+    sys.exit(0 if max_diff < 1e-9 and mismatches == 0 else 1)
@@ -0,0 +1,213 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")      #benchmarks never need a real display
+import sys
+import io
+import json
+import time
+import random
+import argparse
+import platform
+import contextlib
+import numpy as np
+import pygame
+import neat
+import main
+import world
+import course
+from batchnet import BatchNetwork
+from renderer import FastRenderer
+
+
+"""
+Benchmarks for the hot paths, headless and with fixed seeds:
+
+    step_objects_N / step_numpy_N   frames/sec of the bird/pipe/base step for N birds (Bird objects vs world.World)
+    activate / activate_batch       FeedForwardNetwork.activate calls/sec vs BatchNetwork rows/sec
+    collide_near / collide_far      Pipe.collide calls/sec w/ the bird at the pipe vs far from it
+    draw_window                     frames/sec drawing 50 birds to an offscreen surface
+    draw_window_1000 / draw_fast_1000   frames/sec w/ 1000 birds: draw_window vs renderer.FastRenderer
+    generations_objects / _numpy    generations/sec of a full p.run
+
+Every result is "bigger = faster". Results are printed (and written with --out) as json;
+--compare baseline.json flags anything that got more than --tolerance slower and exits 1, so
+changes can be gated on it.
+
+    python bench.py --out baseline.json
+    python bench.py --compare baseline.json
+"""
+
+
+SEED = 1234
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt")
+
+
+def load_config(pop_size=50):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, CONFIG_PATH)
+    config.pop_size = pop_size
+    config.fitness_threshold = float("inf")     #never stop early, so every run does the same work
+    return config
+
+
+def timed(func, repeat):        #best (smallest) wall time of `repeat` runs
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def flap(y):        #scripted policy that keeps birds in the air, so every frame has the same number of birds
+    return y > 400
+
+
+def bench_step_objects(n, frames):
+    def go():
+        birds = [main.Bird(230, 350 + (i % 50)) for i in range(n)]
+        heights = course.heights(SEED)
+        pipes = [main.Pipe(heights)]
+        base = main.Base(730)
+        for _ in range(frames):
+            for bird in birds:
+                bird.move()
+                if flap(bird.y):
+                    bird.jump()
+            for pipe in pipes:
+                for bird in birds:
+                    pipe.collide(bird)
+                pipe.move()
+            if pipes[-1].x < 230:
+                pipes.append(main.Pipe(heights))
+            if pipes[0].x + main.Pipe.WIDTH < 0:
+                pipes.pop(0)
+            base.move()
+    return go
+
+
+def bench_step_numpy(n, frames):
+    def policy(inputs, alive):
+        return flap(inputs[:, 0])
+
+    def go():
+        w = world.World(n, course.heights(SEED))
+        w.y += np.arange(n) % 50
+        for _ in range(frames):
+            w.alive[:] = True       #measure a full population every frame
+            w.step(policy)
+            w.done = False
+    return go
+
+
+def sample_genome(config):
+    random.seed(SEED)
+    g = next(iter(neat.Population(config).population.values()))
+    for _ in range(10):
+        g.mutate(config.genome_config)
+    return g
+
+
+def run_benchmarks(quick=False, only=None):
+    scale = 0.2 if quick else 1.0
+    repeat = 1 if quick else 3
+    config = load_config()
+    results = {}
+
+    def record(name, ops, func, unit):
+        if only and only not in name:
+            return
+        elapsed = timed(func, repeat)
+        results[name] = {"value": ops / elapsed, "unit": unit}
+        print("{:<24} {:>14.1f} {}".format(name, ops / elapsed, unit), file=sys.stderr)
+
+    for n, frames in ((50, 400), (1000, 40), (10000, 8)):
+        frames = max(2, int(frames * scale))
+        record("step_objects_{}".format(n), frames, bench_step_objects(n, frames), "frames/s")
+        record("step_numpy_{}".format(n), frames * 10, bench_step_numpy(n, frames * 10), "frames/s")
+
+    genome = sample_genome(config)
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    calls = int(20000 * scale)
+    record("activate", calls, lambda: [net.activate((300.0, 120.0, 80.0)) for _ in range(calls)], "calls/s")
+
+    batch_net = BatchNetwork([net] * 1000)
+    rows = np.tile([300.0, 120.0, 80.0], (1000, 1))
+    passes = max(1, int(200 * scale))
+    record("activate_batch", passes * 1000, lambda: [batch_net.activate(rows) for _ in range(passes)], "rows/s")
+
+    pipe = main.Pipe(course.heights(SEED))
+    near = main.Bird(230, pipe.height - 20)     #overlapping the pipe's columns + edge, so the mask test runs
+    pipe.x = 200
+    far = main.Bird(230, 350)
+    far_pipe = main.Pipe(course.heights(SEED))
+    calls = int(20000 * scale)
+    record("collide_near", calls, lambda: [pipe.collide(near) for _ in range(calls)], "calls/s")
+    record("collide_far", calls, lambda: [far_pipe.collide(far) for _ in range(calls)], "calls/s")
+
+    pygame.display.set_mode((main.WIN_WIDTH, main.WIN_HEIGHT))
+    surface = pygame.Surface((main.WIN_WIDTH, main.WIN_HEIGHT))
+    birds = [main.Bird(230, 300 + i) for i in range(50)]
+    pipes = [main.Pipe(course.heights(SEED))]
+    base = main.Base(730)
+    frames = max(2, int(100 * scale))
+    record("draw_window", frames, lambda: [main.draw_window(surface, birds, pipes, base, 0, 0) for _ in range(frames)], "frames/s")
+
+    many = [main.Bird(230, 100 + (i % 500)) for i in range(1000)]
+    for i, bird in enumerate(many):     #spread the tilts like a real flock
+        for _ in range(i % 8):
+            bird.move()
+    frames = max(2, int(30 * scale))
+    record("draw_window_1000", frames, lambda: [main.draw_window(surface, many, pipes, base, 0, 0) for _ in range(frames)], "frames/s")
+    painter = FastRenderer(surface)
+    record("draw_fast_1000", frames, lambda: [painter.draw(many, pipes, base, 0, 0) for _ in range(frames)], "frames/s")
+
+    gens = max(1, int(3 * scale))
+    for engine in ("objects", "numpy"):
+        def go():
+            random.seed(SEED)
+            main.HEADLESS, main.ENGINE, main.COURSE_SEED = True, engine, SEED
+            p = neat.Population(load_config())
+            with contextlib.redirect_stdout(io.StringIO()):
+                p.run(main.main, gens)
+        record("generations_" + engine, gens, go, "gens/s")
+
+    return results
+
+
+def compare(results, baseline, tolerance):      #names that got slower than baseline by more than tolerance (a fraction)
+    slower = []
+    for name, base in baseline["results"].items():
+        now = results.get(name)
+        if now is not None and now["value"] < base["value"] * (1 - tolerance):
+            slower.append((name, base["value"], now["value"]))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the flappy bird simulation hot paths")
+    parser.add_argument("--out", default=None, help="write results as json to this file")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="flag results slower than this json baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown vs baseline (fraction, default 0.15)")
+    parser.add_argument("--quick", action="store_true", help="fewer frames/repeats (noisier)")
+    parser.add_argument("--only", default=None, help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "pygame": pygame.version.ver,
+                 "machine": platform.machine(), "seed": SEED, "quick": args.quick},
+        "results": run_benchmarks(args.quick, args.only),
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(report["results"], baseline, args.tolerance)
+        for name, before, now in slower:
+            print("REGRESSION {}: {:.1f} -> {:.1f} ({:+.1f}%)".format(name, before, now, 100.0 * (now / before - 1)), file=sys.stderr)
+        sys.exit(1 if slower else 0)
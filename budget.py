@@ -0,0 +1,220 @@
+import os
+import math
+import random
+import numpy as np
+from neat.reporting import BaseReporter
+import world
+
+
+"""
+Adaptive evaluation budgets (main.py --budget): stop simulating once the answer is already decided.
+
+Three parts:
+- cap: an episode stops as soon as the birds still alive reach the cap fitness. Birds that are alive
+  always have exactly the same fitness (same +0.1 per frame, same +5 per pipe), so stopping early never
+  swaps two genomes around - the survivors just end up tied instead of being separated by how much
+  longer each one would have lived. With a finite fitness_threshold (criterion max) the cap is
+  threshold * courses, so a genome that would reach the threshold still does and the run ends on the
+  same generation. On that generation the genomes that stopped at the cap fly those courses again w/o
+  it, so the winner is the real best one and not just the first of a tie. With no threshold (inf) it's
+  MARGIN x the best fitness seen so far, so it grows with the population. A cap no course can reach
+  (more than MAX_FITNESS) is no cap at all.
+- racing: with several courses, genomes fly them one at a time. After MIN_COURSES, a genome whose mean
+  is clearly (Z standard errors) above or below the bar for making the parent pool (the top
+  survival_threshold fraction) stops flying courses and keeps the mean of the ones it flew.
+- cutoff: a genome that can't reach that bar even if it scored the most a course can give on every
+  course it has left is dropped too (that one's certain, not statistical).
+
+BudgetReporter prints what got simulated and roughly how many bird-frames were saved each generation.
+Bird-frames are worked out from fitness (alive birds all follow the same fitness-per-frame curve), so
+the hot loops don't count anything extra.
+"""
+
+
+MARGIN = 1.5            #cap = MARGIN x best so far, when there's no fitness threshold
+MIN_COURSES = 2         #courses every genome flies before racing can stop it
+Z = 2.0                 #standard errors a genome's mean has to be from the bar to count as settled
+
+
+def _full_episode():        #fitness a bird has after each frame if it survives until the score passes world.MAX_SCORE
+    xs = [world.PIPE_START_X]       #same pipe bookkeeping as world.World.step (pipes pass the birds at the same frames on every course)
+    passed = [False]
+    score = 0
+    fitness = 0.0
+    curve = []
+    while score <= world.MAX_SCORE:
+        fitness += 0.1
+        add_pipe = False
+        for j in range(len(xs)):
+            if not passed[j] and xs[j] < world.BIRD_X:
+                passed[j] = True
+                add_pipe = True
+            xs[j] -= world.PIPE_VEL
+        if add_pipe:
+            score += 1
+            fitness += 5
+            xs.append(world.PIPE_START_X)
+            passed.append(False)
+        curve.append(fitness)
+    return np.array(curve)
+
+
+CURVE = _full_episode()
+MAX_FITNESS = float(CURVE[-1])      #most fitness one course can give
+MAX_FRAMES = len(CURVE)
+
+
+def frames_for(fitness):        #about how many frames a bird lived to end a course w/ this fitness
+    return int(np.searchsorted(CURVE, fitness + 1)) if fitness > 0 else 1     #+1 covers the -1 for hitting a pipe
+
+
+class Budget:
+    def __init__(self, config, margin=MARGIN, min_courses=MIN_COURSES, z=Z):
+        self.threshold = config.fitness_threshold if config.fitness_criterion == "max" else float("inf")
+        self.survival = config.reproduction_config.survival_threshold
+        self.margin = margin
+        self.min_courses = min_courses
+        self.z = z
+        self.best = None        #best fitness so far (BudgetReporter keeps it up to date)
+        self.reset()
+
+    def reset(self):        #per generation counters
+        self.bird_frames = 0        #simulated
+        self.saved_racing = 0       #estimated bird-frames not simulated because of racing + cutoffs
+        self.saved_cap = 0          #upper bound on bird-frames not simulated because of the cap
+        self.episodes = 0
+        self.capped = 0
+        self.flights = 0            #genome x course episodes flown
+        self.skipped = 0            #... and skipped
+        self.settled = 0
+        self.cut = 0
+
+    def cap(self, courses):     #fitness an episode stops at (None = play it out)
+        if self.threshold != float("inf"):
+            cap = self.threshold * courses
+        elif self.best is not None and self.best > 0:
+            cap = self.margin * self.best
+        else:
+            return None
+        return cap if cap < MAX_FITNESS else None       #one course never gives more than MAX_FITNESS
+
+    def race(self, n, seeds, fly):      #fly(i, seed, idx, cap, record) flies genomes idx on course i and returns their fitness on it
+        cap = self.cap(len(seeds))
+        scores = [[] for _ in range(n)]
+        active = list(range(n))
+        capped = {}     #course -> genomes that stopped at the cap on it
+        for i, seed in enumerate(seeds):
+            fitness = fly(i, seed, active, cap, True)
+            self.episodes += 1
+            self.flights += len(active)
+            for j, f in zip(active, fitness):
+                scores[j].append(f)
+                self.bird_frames += frames_for(f)
+            if cap is not None and max(fitness) >= cap:
+                self.capped += 1
+                self.saved_cap += sum(MAX_FRAMES - frames_for(f) for f in fitness if f >= cap)
+                capped[i] = [j for j, f in zip(active, fitness) if f >= cap]
+
+            left = len(seeds) - i - 1
+            if left and i + 1 >= self.min_courses:
+                before = set(active)
+                active = self.still_racing(scores, active, len(seeds), cap)
+                for j in before.difference(active):
+                    self.skipped += left
+                    self.saved_racing += left * frames_for(sum(scores[j]) / len(scores[j]))
+            if not active:
+                break
+        if capped and max(sum(s) / len(s) for s in scores) >= self.threshold:
+            self.finish(scores, capped, seeds, fly)
+        return scores
+
+    def finish(self, scores, capped, seeds, fly):       #the run ends this gen: play out the capped episodes so ties at the cap get broken
+        for i, idx in sorted(capped.items()):
+            fitness = fly(i, seeds[i], idx, None, False)        #no new replay: the recorded one already has every bird of course i
+            for j, f in zip(idx, fitness):
+                self.saved_cap -= MAX_FRAMES - frames_for(scores[j][i])        #genomes fly their courses in order, so course i is scores[j][i]
+                self.bird_frames += frames_for(f)
+                scores[j][i] = f
+
+    def still_racing(self, scores, active, courses, cap):      #the genomes in active whose place isn't settled yet
+        means = sorted((sum(s) / len(s) for s in scores), reverse=True)
+        bar = means[max(0, int(math.ceil(self.survival * len(means))) - 1)]     #mean needed to be among the parents
+        best_course = min(cap, MAX_FITNESS) if cap is not None else MAX_FITNESS
+        racing = []
+        for j in active:
+            s = scores[j]
+            k = len(s)
+            mean = sum(s) / k
+            if (sum(s) + (courses - k) * best_course) / courses < bar:     #can't reach the bar anymore
+                self.cut += 1
+                continue
+            spread = self.z * math.sqrt(sum((f - mean) ** 2 for f in s) / (k - 1) / k)
+            if mean - spread > bar or mean + spread < bar:
+                self.settled += 1
+                continue
+            racing.append(j)
+        return racing
+
+
+class BudgetReporter(BaseReporter):
+    def __init__(self, budget):
+        self.budget = budget
+
+    def start_generation(self, generation):
+        self.budget.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        b = self.budget
+        if best_genome is not None and best_genome.fitness is not None and (b.best is None or best_genome.fitness > b.best):
+            b.best = best_genome.fitness
+        print("Budget: {} bird-frames simulated, ~{} saved by racing ({} of {} course flights skipped: {} settled, {} cut), "
+              "up to {} by the cap ({} of {} episodes capped)".format(
+                  b.bird_frames, b.saved_racing, b.skipped, b.flights + b.skipped, b.settled, b.cut,
+                  b.saved_cap, b.capped, b.episodes))
+
+
+def verify(courses=6, seed=5):      #(order violations under the cap, solving genomes left w/ capped fitness, parent pool overlap w/ racing, fraction of flights skipped)
+    import neat
+    import main
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+    random.seed(seed)
+    genomes = list(neat.Population(config).population.items())
+    for _, g in genomes:
+        for _ in range(5):
+            g.mutate(config.genome_config)
+
+    saved = main.HEADLESS, main.COURSE_SEED, main.COURSES, main.BUDGET
+    main.HEADLESS, main.COURSE_SEED = True, seed
+
+    def evaluate(k, budget):
+        main.COURSES, main.BUDGET = k, budget
+        for _, g in genomes:
+            g.fitness = None
+        main.main(genomes, config)
+        return [g.fitness for _, g in genomes]
+
+    try:
+        full = evaluate(1, None)
+        capped = evaluate(1, Budget(config))
+        violations = sum(1 for a, b in zip(full, capped) for c, d in zip(full, capped) if a > c and b < d)
+        unfinished = sum(1 for a, b in zip(full, capped) if b >= config.fitness_threshold and a != b)
+
+        full = evaluate(courses, None)
+        budget = Budget(config)
+        raced = evaluate(courses, budget)
+    finally:
+        main.HEADLESS, main.COURSE_SEED, main.COURSES, main.BUDGET = saved
+
+    top = int(math.ceil(config.reproduction_config.survival_threshold * len(genomes)))
+    parents = lambda fitness: set(sorted(range(len(fitness)), key=lambda j: -fitness[j])[:top])
+    overlap = len(parents(full) & parents(raced)) / top
+    return violations, unfinished, overlap, budget.skipped / (budget.flights + budget.skipped)
+
+
+if __name__ == "__main__":
+    violations, unfinished, overlap, skipped = verify()
+    print("cap: {} ranking violations, {} solving genomes left at the cap; racing: {:.0%} of parents the same as full evaluation, "
+          "{:.0%} of course flights skipped".format(violations, unfinished, overlap, skipped))
+    raise SystemExit(1 if violations or unfinished else 0)
@@ -0,0 +1,145 @@
+import os
+import re
+import pickle
+import random
+import struct
+import zlib
+from itertools import count
+import neat
+from neat.reporting import BaseReporter
+
+
+"""
+Checkpoints + winner export for long training runs.
+
+Files are a small fixed header (magic, format version, payload length, crc32) followed by a zlib
+compressed pickle, so they're compact, load in milliseconds, and a truncated or foreign file is caught
+instead of half-loaded. A checkpoint holds everything needed for the run to carry on exactly like it
+never stopped: config, population, species (incl. stagnation history), the genome/species id counters,
+the global random state (used by reproduction and for drawing course seeds) and any extra state from
+the caller (main.py puts GEN + the course settings there). Only the newest `keep` checkpoints are kept.
+
+    Checkpointer(p, "checkpoints")      #add as a reporter; writes checkpoints/checkpoint-00012.fbc ...
+    p, extra = restore(load_latest("checkpoints"))
+"""
+
+
+MAGIC = b"FBNC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHQI")       #magic, version, payload length, crc32 of payload
+_NAME = re.compile(r"checkpoint-(\d+)\.fbc$")
+
+
+def save(path, kind, data):     #write data (a dict) atomically; kind says what it is ("checkpoint" or "winner")
+    payload = zlib.compress(pickle.dumps((kind, data), protocol=pickle.HIGHEST_PROTOCOL))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+    os.replace(tmp, path)       #a crash mid-write never leaves a broken file under the real name
+
+
+def load(path, kind):
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("{} is too short to be a checkpoint".format(path))
+        magic, version, length, crc = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("{} is not a checkpoint file".format(path))
+        if version != VERSION:
+            raise ValueError("{} is format version {}, this code reads version {}".format(path, version, VERSION))
+        payload = f.read(length)
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError("{} is truncated or corrupt".format(path))
+
+    file_kind, data = pickle.loads(zlib.decompress(payload))
+    if file_kind != kind:
+        raise ValueError("{} holds a {}, not a {}".format(path, file_kind, kind))
+    return data
+
+
+def _peek(counter):     #next value of an itertools.count, plus a fresh counter that still starts there
+    n = next(counter)
+    return n, count(n)
+
+
+def list_checkpoints(directory):        #[(generation, path)] oldest first
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        m = _NAME.match(name)
+        if m:
+            found.append((int(m.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def load_latest(directory):     #newest checkpoint in directory, or None if there isn't one
+    found = list_checkpoints(directory)
+    if not found:
+        return None
+    return load(found[-1][1], "checkpoint")
+
+
+def restore(state):     #rebuild the neat.Population from a loaded checkpoint; returns (population, extra)
+    config = state["config"]
+    p = neat.Population(config, initial_state=(state["population"], None, state["generation"]))
+
+    p.species = config.species_set_type(config.species_set_config, p.reporters)
+    p.species.species = state["species"]
+    p.species.genome_to_species = state["genome_to_species"]
+    p.species.indexer = count(state["next_species_id"])
+    p.reproduction.genome_indexer = count(state["next_genome_id"])
+    p.reproduction.ancestors = state["ancestors"]
+    p.best_genome = state["best_genome"]
+
+    random.setstate(state["random_state"])
+    return p, state["extra"]
+
+
+class Checkpointer(BaseReporter):
+    def __init__(self, population, directory, every=1, keep=3, extra=None):
+        self.population = population
+        self.directory = directory
+        self.every = every      #checkpoint every Nth generation
+        self.keep = keep        #how many checkpoints to keep around (oldest get deleted)
+        self.extra = extra      #optional function returning a dict of caller state to save too
+        os.makedirs(directory, exist_ok=True)
+
+    def end_generation(self, config, population, species_set):
+        generation = self.population.generation + 1     #population here is the next gen, not evaluated yet
+        if generation % self.every == 0:
+            self.save(generation, config, population, species_set)
+
+    def save(self, generation, config, population, species_set):
+        reproduction = self.population.reproduction
+        next_genome_id, reproduction.genome_indexer = _peek(reproduction.genome_indexer)
+        next_species_id, species_set.indexer = _peek(species_set.indexer)
+
+        state = {
+            "generation": generation,
+            "config": config,
+            "population": population,
+            "species": species_set.species,
+            "genome_to_species": species_set.genome_to_species,
+            "next_species_id": next_species_id,
+            "next_genome_id": next_genome_id,
+            "ancestors": reproduction.ancestors,
+            "best_genome": self.population.best_genome,
+            "random_state": random.getstate(),
+            "extra": self.extra() if self.extra is not None else {},
+        }
+        save(os.path.join(self.directory, "checkpoint-{:05d}.fbc".format(generation)), "checkpoint", state)
+
+        for _, old in list_checkpoints(self.directory)[:-self.keep]:
+            os.remove(old)
+
+
+def save_winner(path, genome, config):      #winner genome + the config needed to build its network
+    save(path, "winner", {"genome": genome, "config": config})
+
+
+def load_winner(path):      #returns (genome, config)
+    data = load(path, "winner")
+    return data["genome"], data["config"]
@@ -0,0 +1,88 @@
+import sys
+import numpy as np
+import pygame
+
+
+"""
+Collision helpers for bird vs pipe, all giving exactly the same answer as the pixel-perfect
+bird_mask.overlap(pipe_mask, offset) test from Pipe.collide, just without redoing work:
+
+- get_mask: masks are made once per sprite surface (or animation frame) and cached
+- x_overlap / in_gap: cheap bounding box broad phase, so most bird/pipe pairs never touch a mask
+- OverlapTable: vectorized narrow phase. The bird's x is fixed, so for a given horizontal offset dx the
+  only thing that changes is the vertical offset dy. The table works out (once per dx, with the real
+  masks) which dy's overlap, then checks every bird against a pipe with one numpy lookup.
+
+python collision.py checks the table + broad phase against plain mask overlap for every offset.
+"""
+
+
+_masks = {}     #surface -> mask
+
+
+def get_mask(surface):      #cached pygame.mask.from_surface (surfaces used here never change after loading)
+    mask = _masks.get(surface)
+    if mask is None:
+        mask = _masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+
+def x_overlap(dx, bird_width, pipe_width):      #can the bird's rect and the pipe's rect overlap sideways? dx = pipe.x - bird.x
+    return -pipe_width < dx < bird_width
+
+
+def in_gap(bird_y, bird_height, gap_top, gap_bottom):       #is the bird's rect completely inside the gap b/w the pipes?
+    return bird_y >= gap_top and bird_y + bird_height <= gap_bottom
+
+
+class OverlapTable:
+    def __init__(self, bird_mask, pipe_mask):
+        self.bird_mask = bird_mask
+        self.pipe_mask = pipe_mask
+        self.bird_width, self.bird_height = bird_mask.get_size()
+        self.pipe_width, self.pipe_height = pipe_mask.get_size()
+        self.rows = {}      #dx -> bool array over dy = -(pipe_height-1) .. bird_height-1 (anything outside can't overlap)
+
+    def row(self, dx):
+        row = self.rows.get(dx)
+        if row is None:
+            lo = -(self.pipe_height - 1)
+            row = np.array([self.bird_mask.overlap(self.pipe_mask, (dx, dy)) is not None
+                            for dy in range(lo, self.bird_height)], dtype=bool)
+            self.rows[dx] = row
+        return row
+
+    def hits(self, dx, dy):     #dy: int array of (pipe y - bird y) per bird; returns bool array of which birds overlap the pipe
+        if not x_overlap(dx, self.bird_width, self.pipe_width):
+            return np.zeros(len(dy), dtype=bool)
+        row = self.row(dx)
+        i = dy + (self.pipe_height - 1)
+        inside = (i >= 0) & (i < len(row))
+        hit = np.zeros(len(dy), dtype=bool)
+        hit[inside] = row[i[inside]]
+        return hit
+
+
+def verify(bird_mask, pipe_mask):       #number of (dx, dy) offsets where the table or broad phase disagrees with mask.overlap
+    table = OverlapTable(bird_mask, pipe_mask)
+    bw, bh = bird_mask.get_size()
+    pw, ph = pipe_mask.get_size()
+    dys = np.arange(-ph - 10, bh + 10)
+    bad = 0
+    for dx in range(-pw - 5, bw + 5):
+        expected = np.array([bird_mask.overlap(pipe_mask, (dx, int(dy))) is not None for dy in dys])
+        bad += int(np.count_nonzero(table.hits(dx, dys) != expected))
+        if not x_overlap(dx, bw, pw):
+            bad += int(np.count_nonzero(expected))
+    return bad
+
+
+if __name__ == "__main__":
+    import os
+    bird = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png")))
+    pipe = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
+    bad = 0
+    for pipe_img in (pipe, pygame.transform.flip(pipe, False, True)):
+        bad += verify(get_mask(bird), get_mask(pipe_img))
+    print("mismatched offsets: {}".format(bad))
+    sys.exit(0 if bad == 0 else 1)
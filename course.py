@@ -0,0 +1,81 @@
+import os
+import random
+import numpy as np
+
+
+"""
+Seeded pipe courses.
+
+A course is just the sequence of pipe heights (where the bottom edge of the top pipe is), made from an
+explicit seed with the same random.Random(seed).randrange(40, 450) calls the pipes always used, so a seed
+always gives the same course. Courses are stored as small int16 arrays and cached in memory, and
+optionally on disk as memory-mapped files (set_cache_dir), so every generation, worker process and replay
+can share a course instead of making it again.
+
+For evaluating each genome on K courses, course_seeds(seed, k) gives the K seeds (made once per run and
+reused), and a genome's fitness is the mean over them.
+"""
+
+
+MIN_HEIGHT = 40         #same range as Pipe.set_height always used
+MAX_HEIGHT = 450
+LENGTH = 64             #pipes per course; an episode ends at score 51, so this covers it (more are made if ever needed)
+CACHE_SIZE = 256        #max courses kept in memory
+
+_cache = {}             #(seed, length) -> heights array; dicts keep insertion order so the oldest is first
+_cache_dir = None
+
+
+def set_cache_dir(path):        #also keep courses on disk (as memory-mapped files) so other processes/runs can reuse them; None = memory only
+    global _cache_dir
+    _cache_dir = path
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+
+
+def random_heights(rng=random):     #endless pipe heights from rng (the default is the old unseeded behavior)
+    while True:
+        yield rng.randrange(MIN_HEIGHT, MAX_HEIGHT)
+
+
+def make_heights(seed, length=LENGTH):
+    heights = random_heights(random.Random(seed))
+    return np.array([next(heights) for _ in range(length)], dtype=np.int16)
+
+
+def get_course(seed, length=LENGTH):        #heights array for the course from seed, from the cache if we've made it before
+    key = (seed, length)
+    heights = _cache.get(key)
+    if heights is not None:
+        _cache[key] = _cache.pop(key)       #move to the end = most recently used
+        return heights
+
+    if _cache_dir is not None:
+        path = os.path.join(_cache_dir, "course-{}-{}.i16".format(seed, length))
+        if not os.path.exists(path):
+            tmp = path + ".tmp{}".format(os.getpid())      #write then rename so other processes never see half a file
+            make_heights(seed, length).tofile(tmp)
+            os.replace(tmp, path)
+        heights = np.memmap(path, dtype=np.int16, mode="r", shape=(length,))
+    else:
+        heights = make_heights(seed, length)
+
+    _cache[key] = heights
+    if len(_cache) > CACHE_SIZE:
+        del _cache[next(iter(_cache))]
+    return heights
+
+
+def heights(seed, length=LENGTH):       #pipe heights iterator for Pipe/WorldPipe; keeps going past the cached part if an episode runs long
+    course = get_course(seed, length)
+    for h in course:
+        yield int(h)
+
+    rng_heights = random_heights(random.Random(seed))
+    for _ in range(length):
+        next(rng_heights)
+    yield from rng_heights
+
+
+def course_seeds(seed, k=1):        #seeds of the k courses every genome flies; the first is always seed itself
+    return [seed + i for i in range(k)]
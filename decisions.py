@@ -0,0 +1,180 @@
+import os
+import io
+import sys
+import random
+import argparse
+import contextlib
+import numpy as np
+from neat.reporting import BaseReporter
+import world
+
+
+"""
+Fewer network queries per episode (main.py --decide interval|event).
+
+Asking every bird's network every frame mostly repeats the last answer: after a flap the arc is fixed
+(Bird.move is a parabola from the jump), so nothing the network could say changes much until the bird
+gets somewhere new. Decider says which birds get asked this frame; the rest hold. A jump is an impulse,
+so holding means not flapping again until the next decision (repeating it would keep resetting the arc
+and turn one flap into a k-frame climb).
+
+    frame       ask every bird every frame (what main.play always did)
+    interval    ask each bird every k frames
+    event       ask when the nearest pipe changes, the bird crosses an edge of the gap (where the
+                |y - pipe| inputs kink), or its arc hits a breakpoint (the top, or terminal velocity);
+                and at least every k frames, so a falling bird still gets asked before it hits anything
+
+Both engines ask the same Decider, so a genome gets the same fitness in main.play and world.World.
+DecisionReporter prints activations per episode each generation, and `python decisions.py` trains the
+same seeded run in each mode and prints activations + fitness side by side.
+"""
+
+
+MODES = ["frame", "interval", "event"]
+
+
+def _breakpoints():     #tick_counts (frames since a flap) where Bird.move changes regime: the top of the arc + terminal velocity
+    ticks = []
+    up = True
+    capped = False
+    t = 0
+    while not capped:
+        t += 1
+        d = world.JUMP_VEL * t + world.GRAVITY * t**2
+        if up and d >= 0:
+            up = False
+            ticks.append(t)
+        if d >= world.TERMINAL_VEL:
+            capped = True
+            ticks.append(t)
+    return np.array(sorted(set(ticks)))
+
+
+BREAKPOINTS = _breakpoints()
+
+
+class Decider:
+    def __init__(self, mode="frame", k=1):
+        if mode not in MODES:
+            raise ValueError("decision mode must be one of {}".format(", ".join(MODES)))
+        self.mode = mode
+        self.k = max(1, k)
+        self.activations = 0        #networks asked
+        self.bird_frames = 0        #... out of this many chances
+        self.episodes = 0
+        self.start(0)
+
+    def start(self, n):     #new episode w/ n birds (numbered 0..n-1)
+        self.since = np.full(n, self.k - 1)     #frames since each bird was last asked (so everyone gets asked on frame 1)
+        self.region = np.full(n, -1, dtype=np.int64)        #0 above the gap, 1 in it, 2 below (-1 = not seen yet)
+        self.pipe = None
+        self.index = {}
+        self.episodes += 1
+
+    def due(self, ids, ticks, y, pipe, key=None):      #which of birds ids (w/ these tick_counts + ys) to ask this frame, pipe = the nearest one (key = what tells pipes apart, default the pipe itself)
+        since = self.since[ids] + 1
+        if self.mode == "frame":
+            due = np.ones(len(ids), dtype=bool)
+        elif self.mode == "interval":
+            due = since >= self.k
+        else:
+            region = (y > pipe.height).astype(np.int64) + (y > pipe.bottom)
+            due = (since >= self.k) | (region != self.region[ids]) | np.isin(ticks, BREAKPOINTS)
+            key = pipe if key is None else key
+            if key != self.pipe:        #keep the pipe itself (not its id()), so a new pipe can't look like the old one
+                due[:] = True
+                self.pipe = key
+            self.region[ids] = region
+        self.since[ids] = np.where(due, 0, since)
+        self.activations += int(np.count_nonzero(due))
+        self.bird_frames += len(ids)
+        return due
+
+    def due_world(self, w):     #world.World: bool mask over every bird (only alive ones can be due)
+        idx = np.flatnonzero(w.alive)
+        mask = np.zeros(len(w.alive), dtype=bool)
+        pipe = w.ring.view(w.pipe_ind())
+        mask[idx] = self.due(idx, w.tick_count[idx], w.y[idx], pipe, pipe.number)      #ring pipes are copies, so tell them apart by course number
+        return mask
+
+    def track(self, birds):     #main.play: number the Bird objects before any of them die
+        self.index = {bird: i for i, bird in enumerate(birds)}
+
+    def due_birds(self, birds, pipe):       #main.play: list of bools lined up w/ birds (the ones still alive)
+        ids = np.fromiter((self.index[b] for b in birds), dtype=np.int64, count=len(birds))
+        ticks = np.fromiter((b.tick_count for b in birds), dtype=np.int64, count=len(birds))
+        y = np.fromiter((b.y for b in birds), dtype=float, count=len(birds))
+        return self.due(ids, ticks, y, pipe).tolist()
+
+    def reset(self):        #per generation counters
+        self.activations = 0
+        self.bird_frames = 0
+        self.episodes = 0
+
+
+class DecisionReporter(BaseReporter):
+    def __init__(self, decider):
+        self.decider = decider
+
+    def start_generation(self, generation):
+        self.decider.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        d = self.decider
+        if not d.episodes:
+            return
+        print("Decisions ({}, k={}): {} activations ({:.0f}/episode) for {} bird-frames, {:.2f}x fewer than every frame".format(
+            d.mode, d.k, d.activations, d.activations / d.episodes, d.bird_frames, d.bird_frames / max(1, d.activations)))
+
+
+def compare(modes, generations=10, seed=16, engine="numpy"):        #train the same seeded run once per (mode, k); returns one row per mode
+    import neat
+    import main
+
+    rows = []
+    for mode, k in modes:
+        random.seed(seed)
+        config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+        config.fitness_threshold = float("inf")         #always train every gen, so modes are compared over the same length
+        main.HEADLESS, main.ENGINE, main.COURSE_SEED, main.GEN = True, engine, seed, 0
+        main.DECIDER = decider = Decider(mode, k)
+        p = neat.Population(config)
+        stats = neat.StatisticsReporter()
+        p.add_reporter(stats)
+        activations = episodes = bird_frames = 0
+
+        def evaluate(genomes, config):
+            nonlocal activations, episodes, bird_frames
+            decider.reset()
+            main.main(genomes, config)
+            activations += decider.activations
+            episodes += decider.episodes
+            bird_frames += decider.bird_frames
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                p.run(evaluate, generations)
+        finally:
+            main.DECIDER = None
+        best = [g.fitness for g in stats.most_fit_genomes]
+        rows.append({"mode": mode, "k": k, "activations_per_episode": activations / episodes,
+                     "reduction": bird_frames / max(1, activations), "best_fitness": max(best),
+                     "final_mean_fitness": stats.get_fitness_mean()[-1]})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare decision modes: activations per episode vs learned fitness")
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=16)
+    parser.add_argument("--engine", choices=["objects", "numpy"], default="numpy")
+    args = parser.parse_args()
+
+    rows = compare([("frame", 1), ("interval", 2), ("interval", 3), ("event", 4), ("event", 8)],
+                   args.generations, args.seed, args.engine)
+    print("{:<10} {:>3} {:>16} {:>10} {:>13} {:>11}".format("mode", "k", "activations/ep", "reduction", "best fitness", "final mean"))
+    for r in rows:
+        print("{:<10} {:>3} {:>16.0f} {:>9.2f}x {:>13.1f} {:>11.1f}".format(
+            r["mode"], r["k"], r["activations_per_episode"], r["reduction"], r["best_fitness"], r["final_mean_fitness"]))
+    sys.exit(0)
@@ -0,0 +1,356 @@
+import os
+import sys
+import time
+import zlib
+import queue
+import pickle
+import random
+import socket
+import struct
+import argparse
+import itertools
+import threading
+import subprocess
+import course
+
+
+"""
+Distributed genome evaluation over TCP (main.py --coordinator HOST:PORT), a drop-in fitness function
+for p.run like parallel.ParallelEvaluator, but the workers can be on other machines.
+
+    python main.py --headless --seed 1 --coordinator 0.0.0.0:5005      #training host
+    python distributed.py trainer-host:5005                            #on each worker machine, as many as you like
+
+Each generation the coordinator cuts the population into batches and queues them; every connected worker
+takes one batch at a time, flies each genome alone on the gen's course seeds with main.eval_genome
+and sends back the fitnesses. Genomes go over the wire as only what the network is built from (nodes +
+enabled connections, in the genome's own order, so the rebuilt network adds its sums in the same order),
+zlib'd per batch. So with seeded courses every fitness is exactly what serial evaluation gives.
+
+Workers can join or leave at any time, even in the middle of a generation. Workers send a progress
+message after every genome, so a batch of any size is fine as long as no single genome takes longer
+than `timeout`. A batch whose worker disconnects, sends back garbage or goes quiet for longer than that
+is dropped from that worker and put back in the queue for someone else; after `max_tries` workers have
+failed it, the coordinator flies it itself. Results for batches that are no longer wanted are ignored.
+
+Messages are [type (1 byte), length (4 bytes)] + payload. The coordinator sends workers pickles (config,
+batches), so only run workers against a coordinator you trust; workers only ever send back plain numbers.
+
+`python distributed.py --test` checks it on localhost: a few worker processes, one of which disconnects
+mid-batch, one which stalls and one which is slow (batches take longer than the timeout, genomes
+don't), must give exactly the same fitness as serial evaluation; so must a batch nobody finishes.
+"""
+
+
+HELLO, SETUP, BATCH, RESULT, BYE, PROGRESS = range(1, 7)
+_FRAME = struct.Struct("<BI")       #message type, payload length
+_RESULT = struct.Struct("<QI")      #batch id, number of fitnesses (then that many float64)
+
+
+def _send(sock, kind, payload=b""):
+    sock.sendall(_FRAME.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv(sock):
+    kind, length = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    return kind, _recv_exact(sock, length)
+
+
+def parse_address(text):        #"host:port" -> (host, port)
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def encode_genome(genome):      #just what FeedForwardNetwork.create reads
+    nodes = tuple((k, n.bias, n.response, n.activation, n.aggregation) for k, n in genome.nodes.items())
+    conns = tuple((k, c.weight) for k, c in genome.connections.items() if c.enabled)
+    return genome.key, nodes, conns
+
+
+def decode_genome(encoded, config):
+    key, nodes, conns = encoded
+    gc = config.genome_config
+    genome = config.genome_type(key)
+    for k, bias, response, activation, aggregation in nodes:
+        node = gc.node_gene_type(k)
+        node.bias, node.response, node.activation, node.aggregation = bias, response, activation, aggregation
+        genome.nodes[k] = node
+    for k, weight in conns:
+        conn = gc.connection_gene_type(k)
+        conn.weight, conn.enabled = weight, True
+        genome.connections[k] = conn
+    return genome
+
+
+class Coordinator:
+    def __init__(self, address, config, seed=None, courses=1, batch_size=None, timeout=60.0, max_tries=3, eval_func=None):
+        self.seed = seed            #None = draw a new course seed every gen
+        self.courses = courses
+        self.batch_size = batch_size        #None = ~4 batches per connected worker
+        self.timeout = timeout              #seconds a worker can go w/o finishing a genome before it's dropped + the batch requeued
+        self.max_tries = max_tries          #workers a batch can fail on before the coordinator flies it itself
+        self.eval_func = eval_func          #None = main.eval_genome (for those batches)
+        self.setup = zlib.compress(pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.server = socket.create_server(address)
+        self.address = self.server.getsockname()
+        self.todo = queue.Queue()           #(batch id, payload, number of genomes)
+        self.lock = threading.Condition()
+        self.pending = set()                #batch ids this gen still needs
+        self.results = {}                   #batch id -> fitnesses
+        self.ids = itertools.count()
+        self.workers = 0
+        self.requeued = 0
+        self.tries = {}                     #batch id -> workers it failed on
+        self.stuck = []                     #batch ids that failed on max_tries workers
+        self.local = 0                      #batches flown here because of that
+        self.closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self.closed:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:     #server socket closed
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):     #one thread per worker: hand it batches one at a time until it goes away
+        joined = False
+        try:
+            conn.settimeout(self.timeout)
+            kind, _ = _recv(conn)
+            if kind != HELLO:
+                return
+            _send(conn, SETUP, self.setup)
+            with self.lock:
+                self.workers += 1
+                joined = True
+            while not self.closed:
+                try:
+                    batch = self.todo.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                with self.lock:
+                    if batch[0] not in self.pending:        #left over from a finished gen
+                        continue
+                try:
+                    _send(conn, BATCH, batch[1])
+                    kind, payload = _recv(conn)
+                    while kind == PROGRESS:     #another genome done; each recv gets a fresh timeout
+                        kind, payload = _recv(conn)
+                    bid, n = _RESULT.unpack_from(payload)
+                    fitnesses = struct.unpack_from("<{}d".format(n), payload, _RESULT.size)
+                    if kind != RESULT or bid != batch[0] or n != batch[2]:
+                        raise ValueError("worker answered the wrong batch")
+                except (OSError, ValueError, struct.error):     #disconnected, timed out or garbled: someone else does it
+                    with self.lock:
+                        self.tries[batch[0]] = self.tries.get(batch[0], 0) + 1
+                        if self.tries[batch[0]] >= self.max_tries:       #keeps failing: don't hand it out again
+                            self.stuck.append(batch[0])
+                            self.lock.notify_all()
+                        else:
+                            self.todo.put(batch)
+                            self.requeued += 1
+                    return
+                with self.lock:
+                    if bid in self.pending:
+                        self.pending.discard(bid)
+                        self.results[bid] = fitnesses
+                        self.lock.notify_all()
+            try:
+                _send(conn, BYE)
+            except OSError:
+                pass
+        except (OSError, ValueError, struct.error):
+            return
+        finally:
+            conn.close()
+            if joined:
+                with self.lock:
+                    self.workers -= 1
+
+    def evaluate(self, genomes, config):       #same signature as main.main, so p.run can call it
+        seed = self.seed if self.seed is not None else random.randrange(2**32)
+        seeds = course.course_seeds(seed, self.courses)
+        size = self.batch_size or max(1, len(genomes) // (max(1, self.workers) * 4))
+
+        batches = []
+        for i in range(0, len(genomes), size):
+            part = genomes[i:i + size]
+            bid = next(self.ids)
+            payload = zlib.compress(pickle.dumps((bid, seeds, [encode_genome(g) for _, g in part]),
+                                                 protocol=pickle.HIGHEST_PROTOCOL))
+            batches.append((bid, part, payload))
+
+        with self.lock:
+            self.pending = {bid for bid, _, _ in batches}
+            self.results = {}
+            self.tries = {}
+            self.stuck = []
+        for bid, part, payload in batches:
+            self.todo.put((bid, payload, len(part)))
+
+        parts = {bid: part for bid, part, _ in batches}
+        waiting = False
+        while True:
+            with self.lock:
+                if not self.pending:
+                    results = self.results
+                    break
+                stuck = [bid for bid in self.stuck if bid in self.pending]
+                self.stuck = []
+                if not stuck:
+                    if not self.lock.wait(timeout=5.0) and self.workers == 0 and not waiting:
+                        print("Waiting for workers on {}:{} ...".format(*self.address[:2]))
+                        waiting = True
+                    continue
+            for bid in stuck:       #outside the lock, so workers keep handing in the rest meanwhile
+                fitnesses = [self._eval_local(g, config, seeds) for _, g in parts[bid]]
+                with self.lock:
+                    self.local += 1
+                    if bid in self.pending:
+                        self.pending.discard(bid)
+                        self.results[bid] = fitnesses
+
+        for bid, part, _ in batches:
+            for (_, g), fitness in zip(part, results[bid]):
+                g.fitness = fitness
+
+    def _eval_local(self, genome, config, seeds):
+        if self.eval_func is None:
+            import main
+            self.eval_func = main.eval_genome
+        return self.eval_func(genome, config, seeds)
+
+    def close(self):
+        self.closed = True
+        self.server.close()
+
+
+def run_worker(address, eval_func=None, wait=30.0, drop_after=None, stall_after=None, slow=0.0):     #connect to a coordinator and evaluate batches until it says bye
+    if eval_func is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import main
+        eval_func = main.eval_genome
+
+    deadline = time.time() + wait
+    batches = 0
+    while True:
+        try:
+            sock = socket.create_connection(address)
+        except OSError:
+            if time.time() > deadline:
+                return
+            time.sleep(0.5)     #coordinator not up (yet / anymore)
+            continue
+
+        try:
+            _send(sock, HELLO, socket.gethostname().encode())
+            kind, payload = _recv(sock)
+            config = pickle.loads(zlib.decompress(payload))
+            while True:
+                kind, payload = _recv(sock)
+                if kind == BYE:
+                    return
+                bid, seeds, encoded = pickle.loads(zlib.decompress(payload))
+                batches += 1
+                if drop_after is not None and batches > drop_after:      #testing: vanish holding a batch
+                    return
+                if stall_after is not None and batches > stall_after:    #testing: hang holding a batch
+                    time.sleep(3600)
+                fitnesses = []
+                for e in encoded:
+                    if fitnesses:
+                        _send(sock, PROGRESS)       #still alive, just a big batch
+                    time.sleep(slow)        #testing: a healthy but slow machine
+                    fitnesses.append(eval_func(decode_genome(e, config), config, seeds))
+                _send(sock, RESULT, _RESULT.pack(bid, len(fitnesses)) + struct.pack("<{}d".format(len(fitnesses)), *fitnesses))
+        except (OSError, ConnectionError):
+            deadline = time.time() + wait       #lost the coordinator; try to get it back for a while
+        finally:
+            sock.close()
+
+
+def verify(n_workers=3, seed=17, generations=2):        #localhost check incl. workers that drop, stall + are slow; returns (# of fitness mismatches, batches requeued, batches flown locally)
+    import neat
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+    random.seed(seed)
+    genomes = list(neat.Population(config).population.items())
+    for _, g in genomes:
+        for _ in range(10):
+            g.mutate(config.genome_config)
+
+    coordinator = Coordinator(("127.0.0.1", 0), config, seed=seed, courses=2, batch_size=4, timeout=2.0)
+    target = "{}:{}".format(*coordinator.address[:2])
+    me = os.path.abspath(__file__)
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    procs = [subprocess.Popen([sys.executable, me, target], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+             for _ in range(n_workers)]
+    procs.append(subprocess.Popen([sys.executable, me, target, "--drop-after", "0"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    procs.append(subprocess.Popen([sys.executable, me, target, "--stall-after", "0"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    procs.append(subprocess.Popen([sys.executable, me, target, "--slow", "0.8"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    def check(coordinator, gen):
+        coordinator.seed = seed + gen
+        coordinator.evaluate(genomes, config)
+        got = [g.fitness for _, g in genomes]
+        seeds = course.course_seeds(seed + gen, 2)
+        expected = [main.eval_genome(g, config, seeds) for _, g in genomes]
+        return sum(1 for a, b in zip(got, expected) if a != b)
+
+    bad = 0
+    try:
+        for gen in range(generations):
+            bad += check(coordinator, gen)
+    finally:
+        coordinator.close()
+        for p in procs:
+            p.kill()
+            p.wait()
+    requeued = coordinator.requeued
+
+    #a batch no worker ever finishes: the only worker stalls, so after max_tries the coordinator flies everything itself
+    coordinator = Coordinator(("127.0.0.1", 0), config, seed=seed, courses=2, batch_size=len(genomes), timeout=2.0, max_tries=1)
+    target = "{}:{}".format(*coordinator.address[:2])
+    stalled = subprocess.Popen([sys.executable, me, target, "--stall-after", "0"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        bad += check(coordinator, 0)
+    finally:
+        coordinator.close()
+        stalled.kill()
+        stalled.wait()
+    return bad, requeued, coordinator.local
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed evaluation worker (or --test for a localhost self check)")
+    parser.add_argument("coordinator", nargs="?", default=None, help="HOST:PORT given to main.py --coordinator")
+    parser.add_argument("--wait", type=float, default=30.0, help="seconds to keep trying to (re)connect")
+    parser.add_argument("--test", action="store_true", help="run the localhost self check")
+    parser.add_argument("--drop-after", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--stall-after", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--slow", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.test:
+        bad, requeued, local = verify()
+        print("distributed vs serial: {} mismatches ({} batches requeued, {} flown by the coordinator)".format(bad, requeued, local))
+        sys.exit(1 if bad else 0)
+    if args.coordinator is None:
+        parser.error("give the coordinator's HOST:PORT (or --test)")
+    run_worker(parse_address(args.coordinator), wait=args.wait, drop_after=args.drop_after, stall_after=args.stall_after, slow=args.slow)
@@ -0,0 +1,219 @@
+import assets
+import collision
+import course
+
+
+"""
+The game itself - Bird, Pipe and Base - shared by main.py (training) and gameNoAI.py (playing by hand).
+
+The two used to have their own copies w/ different numbers, so a policy trained in one couldn't be
+flown in the other. Now the numbers live in named physics profiles, and each entry point picks one:
+
+    main        jump -11.5, gravity 2.0, terminal velocity 17, pipes/ground move 10 px a frame
+    gameNoAI    jump -10.5, gravity 1.5, terminal velocity 16, pipes/ground move 5 px a frame
+
+A profile also turns Bird.move into table lookups. Between jumps a bird's whole trajectory only depends
+on tick_count (frames since the jump) and whether it has jumped at all (vel is 0 before the first
+jump), so the pixels moved each frame (parabola, terminal clamp, the extra 2 px going up) and the tilt
+(nose up while rising or less than 50 px below the jump, then down 20 degrees a frame to -90) are
+worked out once per tick_count. After `last` ticks nothing changes anymore (terminal velocity, nose
+down), so the tables stop there.
+
+tests/test_engine.py checks the tables against the old per-frame formulas for every profile, and flies
+seeded episodes against values recorded from the game before it moved here.
+"""
+
+
+class Physics:
+    def __init__(self, name, jump_vel, gravity, terminal_vel, pipe_vel, max_rotation=25, rot_vel=20):
+        self.name = name
+        self.jump_vel = jump_vel
+        self.gravity = gravity
+        self.terminal_vel = terminal_vel
+        self.pipe_vel = pipe_vel            #pipes + ground
+        self.max_rotation = max_rotation
+        self.rot_vel = rot_vel
+        tables = [self._tables(0), self._tables(jump_vel)]      #[jumped yet][tick_count]
+        self.last = max(len(t[0]) for t in tables) - 1
+        for drop, tilt in tables:       #pad the shorter one w/ its settled values
+            drop += [drop[-1]] * (self.last + 1 - len(drop))
+            tilt += [tilt[-1]] * (self.last + 1 - len(tilt))
+        self.drop = [t[0] for t in tables]      #pixels moved on each tick (index 0 unused)
+        self.tilt = [t[1] for t in tables]      #tilt after each tick
+
+    def _tables(self, vel):     #step the old Bird.move formulas from a jump (or the start) until nothing changes anymore
+        drop = [0.0]
+        tilts = [0]
+        fallen = 0.0        #y - height (how far below the jump point)
+        tilt = 0            #the first tick always points the nose up, so where the tilt was before doesn't matter
+        t = 0
+        while True:
+            t += 1
+            d = vel * t + self.gravity * t**2
+            if d >= self.terminal_vel:
+                d = self.terminal_vel
+            if d < 0:
+                d -= 2
+            fallen += d
+            if d < 0 or fallen < 50:
+                if tilt < self.max_rotation:
+                    tilt = self.max_rotation
+            elif tilt > -90:
+                tilt -= self.rot_vel
+            drop.append(float(d))
+            tilts.append(tilt)
+            if d == self.terminal_vel and fallen >= 50 and tilt <= -90:
+                return drop, tilts
+
+
+PROFILES = {
+    "main": Physics("main", jump_vel=-11.5, gravity=2.0, terminal_vel=17, pipe_vel=10),
+    "gameNoAI": Physics("gameNoAI", jump_vel=-10.5, gravity=1.5, terminal_vel=16, pipe_vel=5),
+}
+
+
+
+class Bird:
+    PHYSICS = PROFILES["main"]      #subclasses pick their own profile
+    IMGS = assets.BIRD_FRAMES       #names of the 3 animation imgs
+    WIDTH, HEIGHT = assets.size("bird1")        #all 3 are the same size
+    ANIMATION_TIME = 5
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.tilt = 0
+        self.tick_count = 0     #Keep track when we last jumped
+        self.vel = 0
+        self.height = self.y
+        self.img_count = 0
+        self.img_name = self.IMGS[0]
+
+    def jump(self):
+        self.vel = self.PHYSICS.jump_vel        #Main ref point in pygame window is top left. Negative velocity @ middle of window makes upward motion
+        self.tick_count = 0     #reset counter tracking when jump happenned
+        self.height = self.y
+
+    def move(self):     #can use while true, bird.move() to test the movement func and adjust
+        self.tick_count += 1
+        physics = self.PHYSICS
+        t = min(self.tick_count, physics.last)      #past the end of the tables every frame is the same
+        jumped = self.vel != 0
+        self.y = self.y + physics.drop[jumped][t]      #pixels to move this frame: parabola from the jump, terminal clamp + the extra 2 going up
+        self.tilt = physics.tilt[jumped][t]
+
+    def draw(self, win):
+        rotated_image, topleft = self.sprite()
+        win.blit(rotated_image, topleft)       #draw to window
+
+    def sprite(self):       #step the flap animation, return (rotated img, where its top left goes); renderer.py batches these
+        self.animate()
+        return self.image_at(self.y, self.tilt)
+
+    def animate(self):      #one frame of the flap animation (which img, so also which collision mask)
+        self.img_count += 1     #keep track of how many ticks of the image of the bird we've shown
+
+        if self.img_count < self.ANIMATION_TIME:       #swap between the 3 bird images based on counter
+            self.img_name = self.IMGS[0]
+        elif self.img_count < self.ANIMATION_TIME*2:
+            self.img_name = self.IMGS[1]
+        elif self.img_count < self.ANIMATION_TIME*3:
+            self.img_name = self.IMGS[2]
+        elif self.img_count < self.ANIMATION_TIME*4:
+            self.img_name = self.IMGS[1]
+        elif self.img_count == self.ANIMATION_TIME*4 + 1:
+            self.img_name = self.IMGS[0]
+            self.img_count = 0
+        
+        if self.tilt <= -80:        #if pointing down, don't flap.
+            self.img_name = self.IMGS[1]
+            self.img_count = self.ANIMATION_TIME*2
+
+    def image_at(self, y, tilt):        #(current img rotated by tilt, its top left) w/ the bird at y; gameNoAI draws in between frames w/ this
+        rotated_image = assets.rotated(self.img_name, tilt)      #rotates from top left hand corner, not center (made once per img + tilt)
+        new_rect = rotated_image.get_rect(center = self.img.get_rect(topleft = (self.x, y)).center)    #get rect using center of orig image
+        return rotated_image, new_rect.topleft
+
+    @property
+    def img(self):      #current animation img (loads the imgs on first use)
+        return assets.image(self.img_name)
+
+    def get_mask(self):     #used when doing collisions with objects; precomputed per animation frame, no img needed
+        return assets.mask(self.img_name)
+
+
+
+class Pipe:
+    GAP = 200       #how much space b/w pipe
+    VEL = PROFILES["main"].pipe_vel
+    WIDTH, HEIGHT = assets.size("pipe")     #top pipe is the same img flipped over ("pipe_top")
+
+    def __init__(self, heights=None, x=600):
+        self.x = x
+        self.heights = heights if heights is not None else course.random_heights()     #where pipe heights come from; course.heights(seed) gives the same course every time
+        self.height = 0     #this is where bottom edge of top pipe lies
+
+        self.top = 0        #where draw top pipe
+        self.bottom = 0     #where draw bottom pipe
+
+        self.passed = False     #track if bird passed thru
+        self.set_height()       #define where top and bottom pipes, and how tall they are
+
+    def set_height(self):
+        self.height = next(self.heights)
+        self.top = self.height - self.HEIGHT     #find the top edge of the top pipe (do bottom edge of top pipe minus height of top pipe = get coord of top of top pipe)
+        self.bottom = self.height + self.GAP                    #remember, subtract height means go up; self.bottom is the top edge of bottom pipe
+
+    def move(self):     #move to left
+        self.x -= self.VEL
+
+    def draw(self, win):
+        win.blit(assets.image("pipe_top"), (self.x, self.top))      #draw top pipe using its top
+        win.blit(assets.image("pipe"), (self.x, self.bottom))       #draw bottom pip using its top
+
+    def collide(self, bird):        #use mask to get pixel-perfect collision, not by boundingrect
+        #broad phase first: if the bird's rect is nowhere near the pipe's columns or sits inside the gap, masks can't overlap
+        if not collision.x_overlap(self.x - bird.x, bird.WIDTH, self.WIDTH):
+            return False
+        if collision.in_gap(round(bird.y), bird.HEIGHT, self.height, self.bottom):
+            return False
+
+        bird_mask = bird.get_mask()
+        top_mask = assets.mask("pipe_top")
+        bottom_mask = assets.mask("pipe")
+
+        top_offset = (self.x - bird.x, self.top - round(bird.y))    #offset from top pipe (w/ its top edge) to bird
+        bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))      #offset from bottom pipe (w/ its top edge) to bird
+
+        b_point = bird_mask.overlap(bottom_mask, bottom_offset)     #tell point of overlap b/w bird mask and bot pipe; returns None if no collision
+        t_point = bird_mask.overlap(top_mask, top_offset)
+
+        if t_point or b_point:      #if either collision exists
+            return True
+        
+        return False
+    
+
+
+class Base:
+    VEL = PROFILES["main"].pipe_vel     #ground scrolls with the pipes
+    WIDTH = assets.size("base")[0]
+
+    def __init__(self, y):
+        self.y = y
+        self.x1 = 0
+        self.x2 = self.WIDTH
+
+    def move(self):     #have 2 bases side by side. 
+        self.x1 -= self.VEL     #x1 is left edge of left base
+        self.x2 -= self.VEL     #x2 left edge of right base
+
+        if self.x1 + self.WIDTH < 0:            #if left base is completely offscreen to left
+            self.x1 = self.x2 + self.WIDTH      #move x1 (and left base) to right edge of right base; now prev right base is on the left
+
+        if self.x2 + self.WIDTH < 0:            #if x2 base is completely offscreen to left
+            self.x2 = self.x1 + self.WIDTH      #move it to the right edge of the x1 base
+
+    def draw(self, win):
+        win.blit(assets.image("base"), (self.x1, self.y))
+        win.blit(assets.image("base"), (self.x2, self.y))
@@ -0,0 +1,209 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import importlib.util
+import numpy as np
+import neat
+from neat.activations import tanh_activation
+from neat.aggregations import sum_aggregation
+import world
+import course
+
+
+"""
+Compile a trained genome into a small stand-alone policy module: straight-line Python (or NumPy), no neat.
+
+    python export.py checkpoints/winner.fbw --out winner_policy.py             #math.tanh, one decision per call
+    python export.py checkpoints/winner.fbw --out winner_policy.py --numpy     #np.tanh over a whole (n, 3) array of inputs
+
+The network is built once w/ FeedForwardNetwork.create (which already drops disabled connections and
+nodes that don't lead to an output), then written out node by node in the same order w/ the same sums:
+    n5 = tanh(2.5 * (bias + response * (i1 * w + i2 * w)))
+weights, biases and responses become literals (bias 0.0, response 1.0 and weight 0.0 terms are left out,
+nodes that only depend on constants are folded into constants), and neat's clamp to +-60 is left out
+since tanh is exactly 1.0 way before that. So the Python version gives exactly the same outputs as
+FeedForwardNetwork.activate, and the NumPy one the same to float rounding.
+
+The generated module has activate(...) (the raw outputs) and jump(y, top, bottom) (main.play's > 0.5
+rule; the NumPy one takes arrays or plain numbers), and imports nothing but math or numpy.
+`python export.py FILE` also checks the compiled outputs against the original network on inputs
+recorded from the genome flying seeded courses, and prints
+microseconds per decision for neat, the compiled Python and the compiled NumPy. With no file it does that
+for a population of mutated random genomes.
+"""
+
+
+def _term(value, weight):
+    return "{} * {!r}".format(value, weight)
+
+
+def compile_source(genome, config, use_numpy=False):        #source of the policy module for genome
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    inputs = ["i{}".format(-k) if k < 0 else "i{}".format(k) for k in net.input_nodes]
+    names = dict(zip(net.input_nodes, inputs))
+    constants = {}      #node -> its value, for nodes that don't depend on any input
+    lines = []
+    connections = 0
+    for node, act_func, agg_func, bias, response, links in net.node_evals:
+        if act_func is not tanh_activation or agg_func is not sum_aggregation:
+            raise ValueError("export only supports tanh activation with sum aggregation")
+        links = [(i, w) for i, w in links if w != 0.0]
+        if all(i in constants for i, _ in links):       #fold: same sum in the same order, done now instead of every call
+            constants[node] = tanh_activation(bias + response * sum(constants[i] * w for i, w in links))
+            continue
+
+        terms = []
+        for i, w in links:
+            if i in constants:
+                terms.append(repr(constants[i] * w))
+            else:
+                terms.append(_term(names[i], w))
+                connections += 1
+        expr = " + ".join(terms) if len(terms) == 1 else "({})".format(" + ".join(terms))      #sum first, then bias, like neat
+        if response != 1.0:
+            expr = "{!r} * {}".format(response, expr)
+        if bias != 0.0:
+            expr = "{!r} + {}".format(bias, expr)
+        names[node] = "n{}".format(node)
+        lines.append("    {} = tanh(2.5 * ({}))".format(names[node], expr))
+
+    outputs = []
+    for k in net.output_nodes:
+        if k in names:
+            outputs.append(names[k])
+        elif use_numpy:
+            outputs.append("np.full(len(inputs), {!r})".format(constants.get(k, 0.0)))
+        else:
+            outputs.append(repr(constants.get(k, 0.0)))     #never computed by neat either: stays 0.0
+
+    doc = '"""\nPolicy for genome {} compiled by export.py: {} nodes, {} connections (genome has {} nodes, {} enabled connections).\n"""'.format(
+        genome.key, len(lines), connections, len(genome.nodes), sum(1 for c in genome.connections.values() if c.enabled))
+    if use_numpy:
+        src = ["import numpy as np", "", "", doc, "", "", "tanh = np.tanh", "", "",
+               "def activate(inputs):      #(n, {}) array of inputs -> (n, {}) array of outputs".format(len(inputs), len(outputs)),
+               "    inputs = np.asarray(inputs, dtype=float)"]
+        src += ["    {} = inputs[:, {}]".format(name, j) for j, name in enumerate(inputs)]
+        src += lines
+        src += ["    return np.stack([{}], axis=1)".format(", ".join(outputs)), "", "",
+                "def jump(y, top, bottom):      #which birds jump: bool array for arrays of y, top, bottom, or a bool for one bird",
+                "    one = np.ndim(y) == 0",
+                "    y, top, bottom = np.atleast_1d(y, top, bottom)",
+                "    out = activate(np.stack([y, top, bottom], axis=1))[:, 0] > 0.5",
+                "    return bool(out[0]) if one else out", ""]
+    else:
+        src = ["from math import tanh", "", "", doc, "", "",
+               "def activate({}):".format(", ".join(inputs))]
+        src += lines
+        src += ["    return {}".format(outputs[0] if len(outputs) == 1 else "({},)".format(", ".join(outputs))), "", "",
+                "def jump(y, top, bottom):      #y, |y - top pipe|, |y - bottom pipe| -> jump or not, like main.play",
+                "    return {} > 0.5".format("activate(y, top, bottom)" if len(outputs) == 1 else "activate(y, top, bottom)[0]"), ""]
+    return "\n".join(src)
+
+
+def export(genome, config, path, use_numpy=False):
+    with open(path, "w") as f:
+        f.write(compile_source(genome, config, use_numpy))
+
+
+def load(path):     #import a generated module from its path
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def record_inputs(genomes, config, seeds, limit=5000):      #network inputs seen by these genomes flying together on the courses, as an (n, 3) array
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    rows = []
+
+    def recording(inputs, alive):
+        rows.append(inputs[alive])
+        return inner(inputs, alive)
+
+    for seed in seeds:
+        w = world.World(len(nets), course.heights(seed))
+        inner = world.net_policy(nets)
+        while not w.done and sum(len(r) for r in rows) < limit:
+            w.step(recording)
+    return np.concatenate(rows)[:limit]
+
+
+def _per_call(func, calls, repeat=3):       #best of repeat runs, in microseconds per call
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def check(genome, config, inputs, directory=None):     #compile genome both ways + compare w/ FeedForwardNetwork on inputs; returns a dict of results
+    directory = directory or tempfile.mkdtemp()
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    py_path = os.path.join(directory, "policy_{}.py".format(genome.key))
+    np_path = os.path.join(directory, "policy_{}_np.py".format(genome.key))
+    export(genome, config, py_path)
+    export(genome, config, np_path, use_numpy=True)
+    py, vec = load(py_path), load(np_path)
+
+    rows = [tuple(float(v) for v in row) for row in inputs]
+    expected = np.array([net.activate(row)[0] for row in rows])
+    compiled = np.array([py.activate(*row) for row in rows], dtype=float).reshape(len(rows), -1)[:, 0]
+    batched = vec.activate(inputs)[:, 0]
+    decisions = expected > 0.5
+    return {
+        "python_mismatches": int(np.count_nonzero(compiled != expected)),       #exact, not just close
+        "numpy_max_diff": float(np.max(np.abs(batched - expected))) if len(rows) else 0.0,
+        "numpy_decision_mismatches": int(np.count_nonzero((batched > 0.5) != decisions)),
+        "us_neat": _per_call(lambda: [net.activate(row) for row in rows], len(rows)),
+        "us_python": _per_call(lambda: [py.activate(*row) for row in rows], len(rows)),
+        "us_numpy_single": _per_call(lambda: [vec.activate(inputs[j:j + 1]) for j in range(len(rows))], len(rows)),
+        "us_numpy_batched": _per_call(lambda: vec.activate(inputs), len(rows)),
+        "path": py_path,
+    }
+
+
+def _report(key, r, rows):
+    print("genome {}: {} recorded inputs, python {} mismatches, numpy max diff {:.1e} ({} decision mismatches); "
+          "us/decision: neat {:.2f}, python {:.2f}, numpy {:.2f} one at a time / {:.3f} batched".format(
+              key, rows, r["python_mismatches"], r["numpy_max_diff"], r["numpy_decision_mismatches"],
+              r["us_neat"], r["us_python"], r["us_numpy_single"], r["us_numpy_batched"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a genome (winner.fbw) into a stand-alone policy module")
+    parser.add_argument("winner", nargs="?", default=None, help="winner file saved by main.py --checkpoint-dir (none = self check)")
+    parser.add_argument("--out", default=None, help="write the policy module here")
+    parser.add_argument("--numpy", action="store_true", help="write the numpy (batched) version")
+    parser.add_argument("--seed", type=int, default=21, help="course seed the check records inputs on")
+    args = parser.parse_args()
+
+    if args.winner is not None:
+        import checkpoint
+        genome, config = checkpoint.load_winner(args.winner)
+        if args.out is not None:
+            export(genome, config, args.out, args.numpy)
+            print("wrote {}".format(args.out))
+        inputs = record_inputs([genome], config, course.course_seeds(args.seed, 3))
+        r = check(genome, config, inputs)
+        _report(genome.key, r, len(inputs))
+        sys.exit(1 if r["python_mismatches"] or r["numpy_decision_mismatches"] else 0)
+
+    random.seed(args.seed)      #self check: mutated random genomes, inputs recorded from them flying together
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+    genomes = list(neat.Population(config).population.values())
+    for g in genomes:
+        for _ in range(random.randrange(30)):
+            g.mutate(config.genome_config)
+    inputs = record_inputs(genomes, config, course.course_seeds(args.seed, 2), limit=2000)
+    failed = False
+    for g in genomes[:8]:
+        r = check(g, config, inputs)
+        _report(g.key, r, len(inputs))
+        failed = failed or r["python_mismatches"] or r["numpy_decision_mismatches"]
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,100 @@
+import hashlib
+from collections import OrderedDict
+from neat.reporting import BaseReporter
+
+
+"""
+Fitness memoization for deterministic (seeded) courses.
+
+On a fixed course a genome's fitness can't change, so there's no point flying the elites again every
+generation, or flying several offspring that came out as exact copies. Genomes are keyed by a hash of
+everything the network is built from (enabled connections + weights, node biases/responses/activation/
+aggregation) plus the course seeds and any other settings fitness depends on (main.py passes --decide,
+--decide-every and --start-pipe); a cache hit skips the simulation entirely.
+
+The cache is a bounded LRU, and CacheReporter prints the hit/miss counts each generation.
+Only valid when every genome flies the same seeded course(s) (main.py only turns it on with --seed).
+"""
+
+
+def genome_key(genome, seeds, settings=()):     #canonical hash of the genome's network + the courses it flies + how
+    parts = []
+    for key in sorted(genome.nodes):
+        n = genome.nodes[key]
+        parts.append("n{}:{!r}:{!r}:{}:{}".format(key, n.bias, n.response, n.activation, n.aggregation))
+    for key in sorted(genome.connections):
+        cg = genome.connections[key]
+        if cg.enabled:      #disabled connections don't end up in the network
+            parts.append("c{}:{}:{!r}".format(key[0], key[1], cg.weight))
+    parts.append("s" + ",".join(str(s) for s in seeds))
+    parts.append("x" + ",".join(repr(v) for v in settings))
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).digest()
+
+
+class FitnessCache:
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()        #key -> fitness, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class CachedEvaluator:      #wraps a p.run fitness function so only genomes we haven't seen on these courses get simulated
+    def __init__(self, eval_genomes, cache, seeds, settings=()):
+        self.eval_genomes = eval_genomes
+        self.cache = cache
+        self.seeds = seeds
+        self.settings = settings        #anything besides the courses that changes fitness
+
+    def evaluate(self, genomes, config):
+        todo = {}       #key -> genomes w/ that key that still need a fitness (exact copies share one simulation)
+        for gid, g in genomes:
+            key = genome_key(g, self.seeds, self.settings)
+            if key in todo:     #exact copy of a genome already queued this gen; counts as a hit since it won't be flown
+                todo[key].append((gid, g))
+                self.cache.hits += 1
+                continue
+
+            fitness = self.cache.get(key)
+            if fitness is not None:
+                g.fitness = fitness
+            else:
+                todo.setdefault(key, []).append((gid, g))
+
+        if todo:
+            self.eval_genomes([same[0] for same in todo.values()], config)
+            for key, same in todo.items():
+                fitness = same[0][1].fitness
+                self.cache.put(key, fitness)
+                for _, g in same[1:]:
+                    g.fitness = fitness
+
+
+class CacheReporter(BaseReporter):
+    def __init__(self, cache):
+        self.cache = cache
+        self.last_hits = 0
+        self.last_misses = 0
+
+    def post_evaluate(self, config, population, species, best_genome):
+        hits = self.cache.hits - self.last_hits
+        misses = self.cache.misses - self.last_misses
+        self.last_hits, self.last_misses = self.cache.hits, self.cache.misses
+        total = hits + misses
+        rate = 100.0 * hits / total if total else 0.0
+        print("Fitness cache: {} hits, {} misses ({:.1f}% hit rate), {} entries".format(hits, misses, rate, len(self.cache.entries)))
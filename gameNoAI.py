@@ -3,167 +3,49 @@ import neat
 import time
 import os
 import random
-pygame.font.init()
+import argparse
+import tempfile
+from collections import deque
+import assets
+import engine
+import course
+import world
+import replay
+import export
 
 WIN_WIDTH = 500
 WIN_HEIGHT = 800
+TICK_RATE = 30          #physics ticks per second (the speed the game always ran at); drawing runs at its own rate
+FPS = 120               #most frames drawn per second (0 = as many as the machine can)
+MAX_CATCHUP = 5         #most ticks run back to back after a stall (e.g. dragging the window); past that the game pauses instead of speeding up
+SHOW_STATS = True       #latency + frame time overlay (F3 toggles it)
 
-BIRD_IMGS = [
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird2.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird3.png"))),
-]     #Doubling size of each img
-PIPE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
-BASE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
-BG_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bg.png")))
-STAT_FONT = pygame.font.SysFont("comicsans", 50)
-
-class Bird:
-    IMGS = BIRD_IMGS
-    MAX_ROTATION = 25
-    ROT_VEL = 20
-    ANIMATION_TIME = 5
-
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.tilt = 0
-        self.tick_count = 0     #Keep track when we last jumped
-        self.vel = 0
-        self.height = self.y
-        self.img_count = 0
-        self.img = self.IMGS[0]
-
-    def jump(self):
-        self.vel = -10.5        #Main ref point in pygame window is top left. Negative velocity @ middle of window makes upward motion
-        self.tick_count = 0     #reset counter tracking when jump happenned
-        self.height = self.y
-
-    def move(self):     #can use while true, bird.move() to test the movement func and adjust
-        self.tick_count += 1
-        d = self.vel*self.tick_count + 1.5*self.tick_count**2       #calc how many pixels up to move this frame, using phys parab equation
-        
-        if d >= 16:     #Set terminal veloc for moving down (dont want infin acceleration)
-            d = 16
-
-        if d < 0:       #Fine tune movement, just add 2 more pixels of movement if we're moving up; can be changed
-            d -= 2
-
-        self.y = self.y + d
-        if d < 0 or self.y < self.height + 50:      #if moving up or the current y-pos is less than the original height + 50
-            if self.tilt < self.MAX_ROTATION:       #if tilt isn't max, go to max (point up)
-                self.tilt = self.MAX_ROTATION       #pos tilt is counter  clockwise
-        else:                                       #otherwise tilt down
-            if self.tilt > -90:
-                self.tilt -= self.ROT_VEL
-
-    def draw(self, win):
-        self.img_count += 1     #keep track of how many ticks of the image of the bird we've shown
-
-        if self.img_count < self.ANIMATION_TIME:       #swap between the 3 bird images based on counter
-            self.img = self.IMGS[0]
-        elif self.img_count < self.ANIMATION_TIME*2:
-            self.img = self.IMGS[1]
-        elif self.img_count < self.ANIMATION_TIME*3:
-            self.img = self.IMGS[2]
-        elif self.img_count < self.ANIMATION_TIME*4:
-            self.img = self.IMGS[1]
-        elif self.img_count == self.ANIMATION_TIME*4 + 1:
-            self.img = self.IMGS[0]
-            self.img_count = 0
-        
-        if self.tilt <= -80:        #if pointing down, don't flap.
-            self.img = self.IMGS[1]
-            self.img_count = self.ANIMATION_TIME*2
-
-        rotated_image = pygame.transform.rotate(self.img, self.tilt)      #rotates from top left hand corner, not center
-        new_rect = rotated_image.get_rect(center = self.img.get_rect(topleft = (self.x, self.y)).center)    #get rect using center of orig image
-        win.blit(rotated_image, new_rect.topleft)       #draw to window
-
-    def get_mask(self):     #used when doing collisions with objects
-        return pygame.mask.from_surface(self.img)
-
-
-
-class Pipe:
-    GAP = 200       #how much space b/w pipe
-    VEL =  5
-
-    def __init__(self, x):
-        self.x = x
-        self.height = 0     #this is where bottom edge of top pipe lies
-
-        self.top = 0        #where draw top pipe
-        self.bottom = 0     #where draw bottom pipe
-        self.PIPE_TOP = pygame.transform.flip(PIPE_IMG, False, True)     #Flip pip eover and store it
-        self.PIPE_BOTTOM = PIPE_IMG
-
-        self.passed = False     #track if bird passed thru
-        self.set_height()       #define where top and bottom pipes, and how tall they are
-
-    def set_height(self):
-        self.height = random.randrange(40, 450)
-        self.top = self.height - self.PIPE_TOP.get_height()     #find the top edge of the top pipe (do bottom edge of top pipe minus height of top pipe = get coord of top of top pipe)
-        self.bottom = self.height + self.GAP                    #remember, subtract height means go up; self.bottom is the top edge of bottom pipe
-
-    def move(self):     #move to left
-        self.x -= self.VEL
-
-    def draw(self, win):
-        win.blit(self.PIPE_TOP, (self.x, self.top))         #draw top pipe using its top
-        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))   #draw bottom pip using its top
-
-    def collide(self, bird):        #use mask to get pixel-perfect collision, not by boundingrect
-        bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
-
-        
-        top_offset = (self.x - bird.x, self.top - round(bird.y))    #offset from top pipe (w/ its top edge) to bird
-        bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))      #offset from bottom pipe (w/ its top edge) to bird
-
-        b_point = bird_mask.overlap(bottom_mask, bottom_offset)     #tell point of overlap b/w bird mask and bot pipe; returns None if no collision
-        t_point = bird_mask.overlap(top_mask, top_offset)
-
-        if t_point or b_point:      #if either collision exists
-            return True
-        
-        return False
-    
-
+#imgs (doubled in size) + font come from assets.py, loaded on first draw
 
-class Base:
-    VEL = 5
-    WIDTH = BASE_IMG.get_width()
-    IMG = BASE_IMG
+class Bird(engine.Bird):      #same Bird as training, w/ this game's own (floatier) physics profile
+    PHYSICS = engine.PROFILES["gameNoAI"]
 
-    def __init__(self, y):
-        self.y = y
-        self.x1 = 0
-        self.x2 = self.WIDTH
 
-    def move(self):     #have 2 bases side by side. 
-        self.x1 -= self.VEL     #x1 is left edge of left base
-        self.x2 -= self.VEL     #x2 left edge of right base
 
-        if self.x1 + self.WIDTH < 0:            #if left base is completely offscreen to left
-            self.x1 = self.x2 + self.WIDTH      #move x1 (and left base) to right edge of right base; now prev right base is on the left
+class Pipe(engine.Pipe):
+    VEL = engine.PROFILES["gameNoAI"].pipe_vel
 
-        if self.x2 + self.WIDTH < 0:            #if x2 base is completely offscreen to left
-            self.x2 = self.x1 + self.WIDTH      #move it to the right edge of the x1 base
+    def __init__(self, x, heights=None):
+        super().__init__(heights, x)        #random heights in 40..450 unless given a course
 
-    def draw(self, win):
-        win.blit(self.IMG, (self.x1, self.y))
-        win.blit(self.IMG, (self.x2, self.y))
+
+
+class Base(engine.Base):
+    VEL = engine.PROFILES["gameNoAI"].pipe_vel
 
 
 
 def draw_window(win, bird, pipes, base, score):
-    win.blit(BG_IMG, (0,0))     #draw bg using top left corner coords
+    win.blit(assets.image("bg"), (0,0))     #draw bg using top left corner coords
     for pipe in pipes:          #have list of pipes bcx will keep adding more
         pipe.draw(win)
 
-    text = STAT_FONT.render("Score: " + str(score), 1, (255, 255, 255))
+    text = assets.font().render("Score: " + str(score), 1, (255, 255, 255))
     win.blit(text, (WIN_WIDTH - 10 - text.get_width(), 10))
 
     base.draw(win)
@@ -172,56 +54,366 @@ def draw_window(win, bird, pipes, base, score):
 
 
 
-def main():     #runs main loop of game
-    bird = Bird(230, 350)
-    base = Base(730)
-    pipes = [Pipe(650)]     #have list of pipes bcx will keep adding more
-    score = 0
+def draw_replay(win, player, birds, base, speed, paused):        #a replay frame: world.World's pipes + birds w/ this file's sprites
+    w = player.world
+    win.blit(assets.image("bg"), (0,0))
+    for pipe in w.pipes:
+        win.blit(assets.image("pipe_top"), (pipe.x, pipe.top))
+        win.blit(assets.image("pipe"), (pipe.x, pipe.bottom))
 
-    win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))  #init game window
-    clock = pygame.time.Clock()
-    run = True
+    for bird, y, tilt, alive in zip(birds, w.y, w.tilt, w.alive):
+        if alive:
+            bird.y = y
+            bird.tilt = int(tilt)
+            bird.draw(win)
 
-    while run:
-        clock.tick(30)      #run at most 30 ticks per second
-        for event in pygame.event.get():        #keeps track of user events (run mouse, button, etc)
-            if event.type == pygame.QUIT:       #if clicked red x on window
-                run = False
-        #bird.move()
+    text = assets.font().render("Score: " + str(w.score), 1, (255, 255, 255))
+    win.blit(text, (WIN_WIDTH - 10 - text.get_width(), 10))
+    status = "paused" if paused else "x{}".format(speed)
+    text = assets.font().render("{}/{} {}".format(w.frames, player.replay.frames, status), 1, (255, 255, 255))
+    win.blit(text, (10, 10))
+
+    base.draw(win)
+    pygame.display.update()
 
 
+
+def watch(path, genomes=None, start=0, speed=1, death=False):      #play back a replay.py file (from main.py --record)
+    rec = replay.Replay(path)
+    player = replay.Player(rec, rec.birds_for(genomes) if genomes else None)
+    if death:       #start 2 sec before the (last of the) shown bird(s) dies
+        start = max(0, player.death_frame() - 60)
+    player.seek(start)
+
+    birds = [engine.Bird(world.BIRD_X, y) for y in player.world.y]      #only used to draw; the replay's world does the physics (training's profile)
+    base = engine.Base(730)
+    win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+    pygame.display.set_caption("Replay - " + os.path.basename(path))
+    clock = pygame.time.Clock()
+    paused = False
+
+    while True:
+        clock.tick(30)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:         #pause
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:       #5 sec forwards/backwards
+                    player.seek(player.frame + 150)
+                elif event.key == pygame.K_LEFT:
+                    player.seek(max(0, player.frame - 150))
+                elif event.key == pygame.K_UP:          #fast-forward: more frames per tick
+                    speed = min(speed * 2, 64)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed // 2, 1)
+                elif event.key == pygame.K_HOME:
+                    player.seek(0)
+
+        if not paused and not player.done:
+            player.step(speed)
+            base.move()
+        draw_replay(win, player, birds, base, speed, paused)
+
+
+
+class Game:     #one round: bird, pipes, ground + score, stepped one physics tick at a time (knows nothing about time or drawing)
+    def __init__(self, heights=None, physics="gameNoAI", policy=None):
+        if physics == "gameNoAI":
+            self.Bird, self.Pipe, self.Base, self.pipe_x = Bird, Pipe, Base, 650
+        else:       #training's physics, e.g. to watch an exported policy fly the way it was trained
+            self.Bird, self.Pipe, self.Base, self.pipe_x = engine.Bird, engine.Pipe, engine.Base, 600
+        self.heights = heights if heights is not None else course.random_heights()
+        self.bird = self.Bird(230, 350)
+        self.base = self.Base(730)
+        self.pipes = [self.Pipe(x=self.pipe_x, heights=self.heights)]
+        self.policy = policy        #export.py module flying the bird (None = you)
+        self.score = 0
+        self.ticks = 0
+        self.started = policy is not None       #waits for the first flap
+        self.dead = False
+
+    def state(self):        #what drawing interpolates between two ticks
+        return self.bird.y, self.bird.tilt, {pipe: pipe.x for pipe in self.pipes}, self.base.x1, self.base.x2
+
+    def step(self, jump=False):     #one physics tick; jump = a key press landed on this tick
+        if self.dead:
+            return
+        if jump:
+            self.started = True
+            self.bird.jump()
+        if not self.started:
+            return
+        self.ticks += 1
+        bird = self.bird
+        bird.move()
+        bird.animate()      #the animation img is also the collision mask, so it steps w/ the physics, not w/ drawing
+
+        pipe_ind = 1 if len(self.pipes) > 1 and bird.x > self.pipes[0].x + self.pipes[0].WIDTH else 0
+        if self.policy is not None:     #same inputs + order as main.play: move, ask, jump
+            pipe = self.pipes[pipe_ind]
+            if self.policy.jump(bird.y, abs(bird.y - pipe.height), abs(bird.y - pipe.bottom)):
+                bird.jump()
+
         #Pipe management
-        add_pipe = False    #flag checking if need add a new pipe (old one done)
-        rem = []            #list of pipes to be removed (they're offscreen)
-        for pipe in pipes:
+        add_pipe = False
+        rem = []
+        for pipe in self.pipes:
             if pipe.collide(bird):
-                pass
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:        #if completely offscreen to the left
+                self.dead = True
+            if pipe.x + pipe.WIDTH < 0:        #if completely offscreen to the left
                 rem.append(pipe)
-
             if not pipe.passed and pipe.x < bird.x:         #if bird went thru and havent set 'passed' flag yet, set it true
                 pipe.passed = True
                 add_pipe = True
             pipe.move()
 
         if add_pipe:
-            score += 1
-            pipes.append(Pipe(650))
-
+            self.score += 1
+            self.pipes.append(self.Pipe(x=self.pipe_x, heights=self.heights))
         for r in rem:
-            pipes.remove(r)
+            self.pipes.remove(r)
+
+        if bird.y + bird.HEIGHT >= 730 or bird.y < 0:       #hit the ground or flew off the top
+            self.dead = True
+        self.base.move()
+
+
+
+class Loop:     #fixed timestep: runs Game ticks at TICK_RATE no matter how often it gets called; key presses land on the next tick
+    def __init__(self, game, now, tick_rate=TICK_RATE):
+        self.game = game
+        self.dt = 1.0 / tick_rate
+        self.next_tick = now        #time the next tick happens at
+        self.presses = deque()      #timestamps of key presses not applied yet
+        self.prev = game.state()
+
+    def press(self, t):
+        self.presses.append(t)
+
+    def advance(self, now):     #run every tick due by now; returns the timestamps of the presses that got applied
+        applied = []
+        ticks = 0
+        while self.next_tick <= now:
+            if ticks == MAX_CATCHUP:        #too far behind: drop the time instead of fast-forwarding through it
+                self.next_tick = now + self.dt
+                break
+            jump = False
+            while self.presses and self.presses[0] <= self.next_tick:      #pressed since the last tick
+                applied.append(self.presses.popleft())
+                jump = True
+            self.prev = self.game.state()
+            self.game.step(jump)
+            self.next_tick += self.dt
+            ticks += 1
+        return applied
+
+    def alpha(self, now):       #how far from the last tick to the next one we are, 0..1 (drawing is one tick behind + interpolated)
+        return min(1.0, max(0.0, 1.0 - (self.next_tick - now) / self.dt))
+
+
+
+class Stats:        #frame times + input-to-photon latencies for the overlay
+    def __init__(self, frames=120, presses=20):
+        self.frame_times = deque(maxlen=frames)
+        self.latencies = deque(maxlen=presses)
+        self.last = None
+
+    def frame(self, shown, presses):        #a frame just got to the screen at shown, showing these presses' first tick
+        if self.last is not None:
+            self.frame_times.append(shown - self.last)
+        self.last = shown
+        self.latencies.extend(shown - t for t in presses)
+
+    def lines(self):
+        lines = []
+        if self.frame_times:
+            avg = sum(self.frame_times) / len(self.frame_times)
+            lines.append("frame {:.1f} ms avg, {:.1f} worst ({:.0f} fps), physics {} Hz".format(
+                avg * 1e3, max(self.frame_times) * 1e3, 1 / avg if avg else 0, TICK_RATE))
+        if self.latencies:
+            lines.append("input->photon {:.1f} ms last, {:.1f} avg".format(
+                self.latencies[-1] * 1e3, sum(self.latencies) / len(self.latencies) * 1e3))
+        return lines
+
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def draw_game(win, game, prev, alpha, stats):       #game between the previous tick (prev) and now, alpha of the way
+    y0, tilt0, pipes0, x1_0, x2_0 = prev
+    win.blit(assets.image("bg"), (0,0))
+    for pipe in game.pipes:
+        x = lerp(pipes0.get(pipe, pipe.x), pipe.x, alpha)      #new pipes weren't there last tick
+        win.blit(assets.image("pipe_top"), (x, pipe.top))
+        win.blit(assets.image("pipe"), (x, pipe.bottom))
+
+    text = assets.font().render("Score: " + str(game.score), 1, (255, 255, 255))
+    win.blit(text, (WIN_WIDTH - 10 - text.get_width(), 10))
+
+    base = game.base
+    for x0, x in ((x1_0, base.x1), (x2_0, base.x2)):
+        if x > x0:      #wrapped around to the right this tick, don't slide it back across the screen
+            x0 = x + base.VEL
+        win.blit(assets.image("base"), (lerp(x0, x, alpha), base.y))
+
+    bird = game.bird
+    img, topleft = bird.image_at(lerp(y0, bird.y, alpha), round(lerp(tilt0, bird.tilt, alpha)))
+    win.blit(img, topleft)
 
+    small = stats_font()
+    if not game.started or game.dead:
+        text = small.render("space to flap" if not game.dead else "game over - space to go again", 1, (255, 255, 255))
+        win.blit(text, ((WIN_WIDTH - text.get_width()) // 2, 300))
+    if SHOW_STATS:
+        for k, line in enumerate(stats.lines()):
+            win.blit(small.render(line, 1, (255, 255, 255)), (10, 60 + 22 * k))
 
 
-        #Bird movement
-        if bird.y + bird.img.get_height() >= 730:       # if bot of bird touching ground
-            pass
 
-        base.move()
-        draw_window(win, bird, pipes, base, score)
+_stats_font = None
 
+def stats_font():
+    global _stats_font
+    if _stats_font is None:
+        pygame.font.init()
+        _stats_font = pygame.font.Font(None, 24)        #pygame's own font, so it works w/o system fonts
+    return _stats_font
+
+
+
+def play(policy=None, physics="gameNoAI"):      #the game: input, fixed-timestep physics + interpolated drawing, each at its own pace
+    global SHOW_STATS
+    win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))  #init game window
+    pygame.display.set_caption("Flappy Bird")
+    now = time.perf_counter()
+    loop = Loop(Game(policy=policy, physics=physics), now)
+    stats = Stats()
+    next_frame = now
+    unseen = []         #applied presses whose tick hasn't been drawn yet
+
+    while True:
+        now = time.perf_counter()
+        for event in pygame.event.get():        #keeps track of user events (run mouse, button, etc)
+            if event.type == pygame.QUIT:       #if clicked red x on window
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    SHOW_STATS = not SHOW_STATS
+                elif event.key == pygame.K_ESCAPE:
+                    return
+                elif event.key in (pygame.K_SPACE, pygame.K_UP):
+                    if loop.game.dead:
+                        loop = Loop(Game(policy=policy, physics=physics), now)
+                    else:
+                        loop.press(now)     #timestamped now, applied on the next tick
+            elif event.type == pygame.MOUSEBUTTONDOWN and not loop.game.dead:
+                loop.press(now)
+
+        unseen += loop.advance(now)
+        if unseen or not FPS or now >= next_frame:      #draw a frame w/ a new flap in it right away
+            draw_game(win, loop.game, loop.prev, loop.alpha(now), stats)
+            pygame.display.update()
+            shown = time.perf_counter()
+            stats.frame(shown, unseen)
+            unseen = []
+            next_frame = max(next_frame + 1.0 / FPS, shown) if FPS else shown
+        else:       #short naps so presses get timestamped within ~1 ms whatever the frame rate
+            time.sleep(max(0.0, min(0.001, next_frame - now, loop.next_tick - now)))
+
+
+
+def verify(seed=22, seconds=20):        #number of render rates whose game came out different from ticking w/o drawing at all
+    rng = random.Random(seed)
+    presses = []        #when to press: a simple autopilot flying the course one tick at a time, pressing somewhere in the tick before
+    game = Game(course.heights(seed))
+    loop = Loop(game, 0.0)
+    while loop.next_tick < seconds and not game.dead:
+        bird = game.bird
+        pipe = game.pipes[1 if len(game.pipes) > 1 and bird.x > game.pipes[0].x + game.pipes[0].WIDTH else 0]
+        if not game.started or (bird.y > pipe.bottom - 90 and bird.tick_count > 3):
+            presses.append(loop.next_tick - rng.uniform(0.1, 0.9) * loop.dt)
+            loop.press(presses[-1])
+        loop.advance(loop.next_tick)
+
+    def run(frame_times):       #feed the same presses through a Loop called at these times; returns the end state
+        game = Game(course.heights(seed))
+        loop = Loop(game, 0.0)
+        todo = deque(presses)
+        for now in frame_times:
+            while todo and todo[0] <= now:
+                loop.press(todo.popleft())
+            loop.advance(now)
+        return game.ticks, game.score, game.dead, game.bird.y, [(p.x, p.height) for p in game.pipes]
+
+    ticks_only = run([k / TICK_RATE for k in range(int(seconds * TICK_RATE) + 1)] + [seconds])
+    bad = 0
+    for fps in (240, 144, 60, 30, 24, 10):     #slowest frames still under MAX_CATCHUP ticks
+        times = []
+        t = 0.0
+        while t < seconds:
+            times.append(t)
+            t += rng.uniform(0.5, 1.5) / fps        #jittery frames
+        bad += run(times + [seconds]) != ticks_only
+    return bad
+
+
+
+def verify_policies(seed=22, genomes=6, ticks=600):        #number of genomes whose numpy export flew a Game differently from their python export
+    random.seed(seed)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+    directory = tempfile.mkdtemp()
+    bad = 0
+    for genome in list(neat.Population(config).population.values())[:genomes]:
+        for _ in range(random.randrange(30)):
+            genome.mutate(config.genome_config)
+        ends = []
+        for use_numpy in (False, True):     #Game.step asks the policy about one bird at a time, w/ plain numbers
+            path = os.path.join(directory, "policy_{}{}.py".format(genome.key, "_np" if use_numpy else ""))
+            export.export(genome, config, path, use_numpy)
+            game = Game(course.heights(seed), "main", export.load(path))
+            while game.ticks < ticks and not game.dead:
+                game.step(False)
+            ends.append((game.ticks, game.score, game.bird.y))
+        bad += ends[0] != ends[1]
+    return bad
+
+
+
+def main(replay_path=None, genomes=None, start=0, speed=1, death=False, policy=None, physics="gameNoAI"):     #plays the game; or plays back a replay if given one
+    if replay_path is not None:
+        return watch(replay_path, genomes, start, speed, death)
+    play(export.load(policy) if policy is not None else None, physics)
     pygame.quit()
     quit()
 
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Flappy Bird, or watch a replay saved by main.py --record")
+    parser.add_argument("replay", nargs="?", default=None, help="replay file (.fbr) to watch")
+    parser.add_argument("--genome", type=int, action="append", metavar="ID",
+                        help="only show this genome's bird (can be given more than once)")
+    parser.add_argument("--start", type=int, default=0, metavar="FRAME", help="frame to start the replay at")
+    parser.add_argument("--death", action="store_true", help="start 2 sec before the shown bird dies")
+    parser.add_argument("--speed", type=int, default=1, help="frames per tick (fast-forward; up/down arrows change it)")
+    parser.add_argument("--fps", type=int, default=FPS, help="most frames drawn per second (0 = unlimited); physics always ticks at {} Hz".format(TICK_RATE))
+    parser.add_argument("--no-stats", action="store_true", help="hide the latency/frame time overlay (F3 toggles it)")
+    parser.add_argument("--policy", default=None, metavar="FILE.py", help="let a policy module from export.py fly")
+    parser.add_argument("--physics", choices=sorted(engine.PROFILES), default="gameNoAI",
+                        help="physics profile (main = the one policies are trained with)")
+    parser.add_argument("--test", action="store_true", help="check physics come out the same at any frame rate, and exported policies can fly")
+    args = parser.parse_args()
+    if args.test:
+        bad = verify()
+        print("fixed timestep: {} frame rates gave a different game".format(bad))
+        wrong = verify_policies()
+        print("policies: {} numpy exports flew differently from the python ones".format(wrong))
+        raise SystemExit(1 if bad or wrong else 0)
+    FPS = max(0, args.fps)
+    SHOW_STATS = not args.no_stats
+    main(args.replay, args.genome, args.start, max(1, args.speed), args.death, args.policy, args.physics)
\ No newline at end of file
@@ -1,23 +1,60 @@
 import pygame
 import neat
+from neat.reporting import BaseReporter
 import time
 import os
 import random
-pygame.font.init()
+import argparse
+from parallel import ParallelEvaluator
+from distributed import Coordinator, parse_address
+import world
+import course
+from fitness_cache import FitnessCache, CachedEvaluator, CacheReporter
+import checkpoint
+from profiler import FrameProfiler, ProfilerReporter
+from batchnet import BatchNetwork, batch_policy
+import assets
+import collision
+from engine import Bird, Pipe, Base
+from renderer import FastRenderer
+from spectator import Publisher
+import replay
+from budget import Budget, BudgetReporter
+from decisions import Decider, DecisionReporter
 
 WIN_WIDTH = 500
 WIN_HEIGHT = 800
 GEN = 0
-
-BIRD_IMGS = [
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird2.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird3.png"))),
-]     #Doubling size of each img
-PIPE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
-BASE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
-BG_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bg.png")))
-STAT_FONT = pygame.font.SysFont("comicsans", 50)
+GENERATIONS = 50        #max gens to train for (counting ones done before a --resume)
+
+HEADLESS = False        #no window, no tick limit, no drawing; sim runs as fast as the cpu allows
+RENDER_EVERY = 0        #when headless, still open a window and draw every Nth gen (0 = never draw)
+RENDER_BEST = False     #only draw the bird whose genome had the best fitness last gen (instead of every bird)
+WORKERS = 0             #>0: each genome flies alone on a seeded course in a pool of this many processes (always headless)
+COORDINATOR = None      #(host, port) to listen on for distributed.py workers (always headless), None = evaluate locally
+COURSE_SEED = None      #seed of the pipe course(s); None = new random course every gen
+COURSES = 1             #fly every genome on this many courses (made from COURSE_SEED) and use the mean fitness
+FITNESS_CACHE = 0       #>0: remember fitness of up to this many genomes (needs COURSE_SEED), so unchanged ones aren't flown again
+CHECKPOINT_DIR = None   #save checkpoints + the winner here (None = don't)
+CHECKPOINT_EVERY = 1    #checkpoint every Nth gen
+KEEP_CHECKPOINTS = 3    #only keep the newest few checkpoints
+RESUME = False          #carry on from the newest checkpoint in CHECKPOINT_DIR
+PROFILER = None         #FrameProfiler timing each phase of the frame loop (None = off, costs ~nothing)
+ENGINE = "objects"      #"numpy": headless gens step every bird at once with world.World + batchnet instead of Bird objects
+RENDERER = "classic"    #"fast": renderer.FastRenderer (dirty rects, cached HUD, batched blits) for watching big populations
+TOP_N = 0               #w/ the fast renderer, only draw this many of the best birds + an alive count (0 = all)
+SPECTATE = None         #name of the shared memory feed for spectator.py viewers (None = don't publish)
+PUBLISHER = None        #spectator.Publisher while training w/ SPECTATE
+ADAPTIVE_BUDGET = False #stop episodes/courses early once the ranking is decided (budget.py)
+BUDGET = None           #budget.Budget while training w/ ADAPTIVE_BUDGET
+DECIDE = "frame"        #when birds ask their network: every frame, every DECIDE_EVERY frames ("interval") or on events ("event"); see decisions.py
+DECIDE_EVERY = 4        #interval, or the most frames between asks in event mode
+DECIDER = None          #decisions.Decider unless DECIDE is "frame"
+RECORD_DIR = None       #write a replay (replay.py) of every course of every gen + the winner to this dir
+START_PIPE = 0          #>0: every episode starts just past this pipe, all birds fanned out from one saved world state (world.Snapshot)
+START_STATES = {}       #course seed -> that snapshot (None if the autopilot couldn't get there)
+
+#imgs (doubled in size) + font come from assets.py: loaded on first draw, never when headless
 
 
 """
@@ -37,158 +74,19 @@ max generations (if ran X gens and still dont have model that works, give up and
 Config file - see documentation for NEAT to see the definitions
 
 If want to run as fast as possible, you wouldn't actually draw, and wouldn't limit tick to 30 per sec
+    - that's what --headless does (see bottom of file for the cmd line options)
 """
 
 
-class Bird:
-    IMGS = BIRD_IMGS
-    MAX_ROTATION = 25
-    ROT_VEL = 20
-    ANIMATION_TIME = 5
-
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.tilt = 0
-        self.tick_count = 0     #Keep track when we last jumped
-        self.vel = 0
-        self.height = self.y
-        self.img_count = 0
-        self.img = self.IMGS[0]
-
-    def jump(self):
-        self.vel = -11.5        #Main ref point in pygame window is top left. Negative velocity @ middle of window makes upward motion
-        self.tick_count = 0     #reset counter tracking when jump happenned
-        self.height = self.y
-
-    def move(self):     #can use while true, bird.move() to test the movement func and adjust
-        self.tick_count += 1
-        d = self.vel*self.tick_count + 2.0*self.tick_count**2       #calc how many pixels up to move this frame, using phys parab equation
-        
-        if d >= 17:     #Set terminal veloc for moving down (dont want infin acceleration)
-            d = 17
-
-        if d < 0:       #Fine tune movement, just add 2 more pixels of movement if we're moving up; can be changed
-            d -= 2
-
-        self.y = self.y + d
-        if d < 0 or self.y < self.height + 50:      #if moving up or the current y-pos is less than the original height + 50
-            if self.tilt < self.MAX_ROTATION:       #if tilt isn't max, go to max (point up)
-                self.tilt = self.MAX_ROTATION       #pos tilt is counter  clockwise
-        else:                                       #otherwise tilt down
-            if self.tilt > -90:
-                self.tilt -= self.ROT_VEL
-
-    def draw(self, win):
-        self.img_count += 1     #keep track of how many ticks of the image of the bird we've shown
-
-        if self.img_count < self.ANIMATION_TIME:       #swap between the 3 bird images based on counter
-            self.img = self.IMGS[0]
-        elif self.img_count < self.ANIMATION_TIME*2:
-            self.img = self.IMGS[1]
-        elif self.img_count < self.ANIMATION_TIME*3:
-            self.img = self.IMGS[2]
-        elif self.img_count < self.ANIMATION_TIME*4:
-            self.img = self.IMGS[1]
-        elif self.img_count == self.ANIMATION_TIME*4 + 1:
-            self.img = self.IMGS[0]
-            self.img_count = 0
-        
-        if self.tilt <= -80:        #if pointing down, don't flap.
-            self.img = self.IMGS[1]
-            self.img_count = self.ANIMATION_TIME*2
-
-        rotated_image = pygame.transform.rotate(self.img, self.tilt)      #rotates from top left hand corner, not center
-        new_rect = rotated_image.get_rect(center = self.img.get_rect(topleft = (self.x, self.y)).center)    #get rect using center of orig image
-        win.blit(rotated_image, new_rect.topleft)       #draw to window
-
-    def get_mask(self):     #used when doing collisions with objects
-        return pygame.mask.from_surface(self.img)
-
-
-
-class Pipe:
-    GAP = 200       #how much space b/w pipe
-    VEL =  10
-
-    def __init__(self):
-        self.x = 600
-        self.height = 0     #this is where bottom edge of top pipe lies
-
-        self.top = 0        #where draw top pipe
-        self.bottom = 0     #where draw bottom pipe
-        self.PIPE_TOP = pygame.transform.flip(PIPE_IMG, False, True)     #Flip pip eover and store it
-        self.PIPE_BOTTOM = PIPE_IMG
-
-        self.passed = False     #track if bird passed thru
-        self.set_height()       #define where top and bottom pipes, and how tall they are
-
-    def set_height(self):
-        self.height = random.randrange(40, 450)
-        self.top = self.height - self.PIPE_TOP.get_height()     #find the top edge of the top pipe (do bottom edge of top pipe minus height of top pipe = get coord of top of top pipe)
-        self.bottom = self.height + self.GAP                    #remember, subtract height means go up; self.bottom is the top edge of bottom pipe
-
-    def move(self):     #move to left
-        self.x -= self.VEL
-
-    def draw(self, win):
-        win.blit(self.PIPE_TOP, (self.x, self.top))         #draw top pipe using its top
-        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))   #draw bottom pip using its top
-
-    def collide(self, bird):        #use mask to get pixel-perfect collision, not by boundingrect
-        bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
-
-        
-        top_offset = (self.x - bird.x, self.top - round(bird.y))    #offset from top pipe (w/ its top edge) to bird
-        bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))      #offset from bottom pipe (w/ its top edge) to bird
-
-        b_point = bird_mask.overlap(bottom_mask, bottom_offset)     #tell point of overlap b/w bird mask and bot pipe; returns None if no collision
-        t_point = bird_mask.overlap(top_mask, top_offset)
-
-        if t_point or b_point:      #if either collision exists
-            return True
-        
-        return False
-    
-
-
-class Base:
-    VEL = 10
-    WIDTH = BASE_IMG.get_width()
-    IMG = BASE_IMG
-
-    def __init__(self, y):
-        self.y = y
-        self.x1 = 0
-        self.x2 = self.WIDTH
-
-    def move(self):     #have 2 bases side by side. 
-        self.x1 -= self.VEL     #x1 is left edge of left base
-        self.x2 -= self.VEL     #x2 left edge of right base
-
-        if self.x1 + self.WIDTH < 0:            #if left base is completely offscreen to left
-            self.x1 = self.x2 + self.WIDTH      #move x1 (and left base) to right edge of right base; now prev right base is on the left
-
-        if self.x2 + self.WIDTH < 0:            #if x2 base is completely offscreen to left
-            self.x2 = self.x1 + self.WIDTH      #move it to the right edge of the x1 base
-
-    def draw(self, win):
-        win.blit(self.IMG, (self.x1, self.y))
-        win.blit(self.IMG, (self.x2, self.y))
-
-
-
 def draw_window(win, birds, pipes, base, score, gen):
-    win.blit(BG_IMG, (0,0))     #draw bg using top left corner coords
+    win.blit(assets.image("bg"), (0,0))     #draw bg using top left corner coords
     for pipe in pipes:          #have list of pipes bcx will keep adding more
         pipe.draw(win)
 
-    text = STAT_FONT.render("Score: " + str(score), 1, (255, 255, 255))
+    text = assets.font().render("Score: " + str(score), 1, (255, 255, 255))
     win.blit(text, (WIN_WIDTH - 10 - text.get_width(), 10))
 
-    text = STAT_FONT.render("Gen: " + str(gen), 1, (255, 255, 255))
+    text = assets.font().render("Gen: " + str(gen), 1, (255, 255, 255))
     win.blit(text, (10, 10))
 
     base.draw(win)
@@ -207,61 +105,181 @@ def main(genomes, config):     #runs main loop of game; modified to run with mor
     birds = []      #list of bird objects
     #each index in each list corresponds to a certain bird
 
+    best = None         #index of the genome w/ best fitness last gen (only its bird drawn if RENDER_BEST)
+    best_fitness = None
     for _, g in genomes:        #genomes has genomeID and genome object (its a tuple)
         net = neat.nn.FeedForwardNetwork.create(g, config)
         nets.append(net)
-        birds.append(Bird(230, 350))
+        if g.fitness is not None and (best_fitness is None or g.fitness > best_fitness):    #elites keep their fitness from last gen
+            best_fitness = g.fitness
+            best = len(ge)
         g.fitness = 0
         ge.append(g)
 
-
+    #headless gens skip the window, tick limit and drawing entirely; physics are the same either way
+    render = not HEADLESS or (RENDER_EVERY > 0 and GEN % RENDER_EVERY == 0)
+    seeds = gen_course_seeds()
+    if PUBLISHER is not None:
+        PUBLISHER.gen = GEN
+    keys = [gid for gid, _ in genomes]
+    numpy_engine = ENGINE == "numpy" and not render
+    if numpy_engine:
+        full_policy = batch_policy(BatchNetwork(nets))      #every bird's net in one numpy pass per frame
+
+    def fly(i, seed, idx, cap=None, record=True):       #fly genomes idx together on course i; returns their fitness on just that course
+        sub_nets = [nets[j] for j in idx]
+        sub_ge = [ge[j] for j in idx]
+        for g in sub_ge:
+            g.fitness = 0
+        recorder = open_recorder(i, seed, len(idx)) if record else None
+        if DECIDER is not None:
+            DECIDER.start(len(idx))
+        if numpy_engine:
+            policy = full_policy if len(idx) == len(ge) else batch_policy(BatchNetwork(sub_nets))
+            world.play(sub_nets, sub_ge, course.heights(seed), policy=recorder.policy(policy) if recorder else policy,
+                       profiler=PROFILER, publisher=PUBLISHER, cap=cap, decider=DECIDER, start=course_start(seed))
+        else:
+            birds = [Bird(230, 350) for _ in idx]       #fresh birds for every course
+            best_bird = birds[idx.index(best)] if best in idx else None
+            play(birds, sub_nets, list(sub_ge), course.heights(seed), render=render, best_bird=best_bird, recorder=recorder,
+                 cap=cap, decider=DECIDER)
+        if recorder is not None:
+            recorder.close([g.fitness for g in sub_ge], [keys[j] for j in idx])
+        return [g.fitness for g in sub_ge]
+
+    if BUDGET is not None:
+        scores = BUDGET.race(len(ge), seeds, fly)       #some genomes fly fewer courses
+    else:
+        scores = [[] for _ in ge]
+        everyone = list(range(len(ge)))
+        for i, seed in enumerate(seeds):
+            for s, f in zip(scores, fly(i, seed, everyone)):
+                s.append(f)
+
+    for g, s in zip(ge, scores):        #mean fitness over the courses flown
+        total = 0
+        for f in s:
+            total += f
+        g.fitness = total / len(s) if len(s) > 1 else total
+
+
+
+def open_recorder(i, seed, n):      #replay.Recorder for this gen's i-th course, or None when not recording
+    if RECORD_DIR is None:
+        return None
+    return replay.Recorder(os.path.join(RECORD_DIR, "gen-{:05d}-{}.fbr".format(GEN, i)), seed, n)
+
+
+
+def course_start(seed):        #saved world state episodes on this course start from (None = the start of the course)
+    if START_PIPE <= 0:
+        return None
+    if seed not in START_STATES:
+        START_STATES[seed] = world.prefix(course.heights(seed), START_PIPE)       #flown once per course, then every gen reuses it
+        if START_STATES[seed] is None:
+            print("Course {}: couldn't fly a prefix to pipe {}, starting from pipe 0".format(seed, START_PIPE))
+    return START_STATES[seed]
+
+
+
+def gen_course_seeds():     #seeds of the course(s) every genome flies this gen
+    seed = COURSE_SEED if COURSE_SEED is not None else random.randrange(2**32)
+    return course.course_seeds(seed, COURSES)
+
+
+
+def eval_genome(genome, config, seeds):     #fly one genome alone on each course in seeds, return its mean fitness (for the parallel evaluator)
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    total = 0
+    for seed in seeds:
+        genome.fitness = 0
+        play([Bird(230, 350)], [net], [genome], course.heights(seed))
+        total += genome.fitness
+    genome.fitness = total / len(seeds) if len(seeds) > 1 else total
+    return genome.fitness
+
+
+
+def play(birds, nets, ge, heights=None, render=False, best_bird=None, recorder=None, cap=None, decider=None):     #run one episode until all birds die or score > 50; adds fitness to the genomes in ge
     base = Base(730)
-    pipes = [Pipe()]     #have list of pipes bcx will keep adding more
+    pipes = [Pipe(heights)]     #have list of pipes bcx will keep adding more
+    heights = pipes[0].heights
     score = 0
 
-    win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))  #init game window
-    clock = pygame.time.Clock()
+    if render:
+        win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))  #init game window
+        clock = pygame.time.Clock()
+        painter = FastRenderer(win, TOP_N) if RENDERER == "fast" else None
     run = True
+    prof = PROFILER
+    if recorder is not None:
+        recorder.track(birds)
+    if decider is not None:
+        decider.track(birds)
 
     while run:
-        clock.tick(30)      #run at most 30 ticks per second
-        for event in pygame.event.get():        #keeps track of user events (run mouse, button, etc)
-            if event.type == pygame.QUIT:       #if clicked red x on window
-                run = False
-                pygame.quit()
-                quit()
+        if prof:
+            prof.start_frame()
+        if render:
+            clock.tick(30)      #run at most 30 ticks per second
+            for event in pygame.event.get():        #keeps track of user events (run mouse, button, etc)
+                if event.type == pygame.QUIT:       #if clicked red x on window
+                    run = False
+                    pygame.quit()
+                    quit()
+            if prof:
+                prof.lap("tick")
 
 
         #MOVING BIRDS
         #need to calc dist to pip just head of bird - check if that's the first pipe in pipe list or 2nd pipe
         pipe_ind = 0
         if len(birds) > 0:
-            if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():  #if there are 2 pipes and bird is ahead of first pipe
+            if len(pipes) > 1 and birds[0].x > pipes[0].x + Pipe.WIDTH:  #if there are 2 pipes and bird is ahead of first pipe
                 pipe_ind = 1
         else:       #quit the game if no birds left
             run = False
             break
 
 
+        alive = len(birds)
         for x, bird in enumerate(birds):
             bird.move()
 
             #give a little fitness for just making it to another frame of the game (i.e. making it longer in the game)
             ge[x].fitness += 0.1    
-            
+        if prof:
+            prof.lap("move")
+
+        jumped = [] if recorder is not None else None
+        due = decider.due_birds(birds, pipes[pipe_ind]) if decider is not None else None
+        for x, bird in enumerate(birds):        #birds don't affect each other, so moving all of them first changes nothing
+            if due is not None and not due[x]:      #holding: no new flap till this bird's next decision
+                continue
             #get output from activation func of current bird's network
             output = nets[x].activate((bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
             #output is a list of output neurons, we only have 1 so index it
             if output[0] > 0.5:        #do jump cmd if good output
                 bird.jump()
-        
+                if jumped is not None:
+                    jumped.append(bird)
+        if jumped is not None:
+            recorder.frame_birds(jumped)
+        if prof:
+            prof.lap("activate")
 
 
         #Pipe management
         add_pipe = False    #flag checking if need add a new pipe (old one done)
         rem = []            #list of pipes to be removed (they're offscreen)
+        tests = 0
         for pipe in pipes:
-            for x, bird in enumerate(birds):
+            if prof:
+                prof.lap("pipes")
+                if birds and collision.x_overlap(pipe.x - birds[0].x, Bird.WIDTH, Pipe.WIDTH):     #same as world.World: only birds past the broad phase
+                    tests += len(birds)
+            for x in range(len(birds) - 1, -1, -1):     #go backwards so popping a bird doesn't skip the one after it
+                bird = birds[x]
                 if pipe.collide(bird):      #if collide, u dont want to keep it in lists, want to get rid of it
                     ge[x].fitness -= 1      #remove 1 every time bird hits pipe
                     birds.pop(x)
@@ -271,8 +289,10 @@ def main(genomes, config):     #runs main loop of game; modified to run with mor
                 if not pipe.passed and pipe.x < bird.x:         #if bird went thru and havent set 'passed' flag yet, set it true
                     pipe.passed = True
                     add_pipe = True
+            if prof:
+                prof.lap("collide")
 
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:        #if completely offscreen to the left
+            if pipe.x + Pipe.WIDTH < 0:        #if completely offscreen to the left
                 rem.append(pipe)
             
             pipe.move()
@@ -283,49 +303,246 @@ def main(genomes, config):     #runs main loop of game; modified to run with mor
             #any genome/bird in the lists now are still alive (not removed by collision logic above)
             for g in ge:
                 g.fitness += 5
-            pipes.append(Pipe())
+            pipes.append(Pipe(heights))
 
         for r in rem:
             pipes.remove(r)
-
+        if prof:
+            prof.lap("pipes")
 
 
         #Bird hits ground or hits top of screen - remove the bird from running
-        for x, bird in enumerate(birds):
-            if bird.y + bird.img.get_height() >= 730 or bird.y < 0:       # if bot of bird touching ground or bird is above window's top
+        for x in range(len(birds) - 1, -1, -1):
+            bird = birds[x]
+            if bird.y + bird.HEIGHT >= 730 or bird.y < 0:       # if bot of bird touching ground or bird is above window's top
                 birds.pop(x)
                 ge.pop(x)
                 nets.pop(x)
+        if prof:
+            prof.lap("ground")
 
         #quit if reach this thresh; will be returned to "winner"
-        if score > 50:
+        #or at the budget cap: birds still alive all have the same fitness, and it's already enough
+        if score > 50 or (cap is not None and ge and ge[0].fitness >= cap):
+            if prof:
+                prof.end_frame(alive, tests)
             break
 
         base.move()
-        draw_window(win, birds, pipes, base, score, GEN)
+        if PUBLISHER is not None:       #never blocks, whether or not a viewer is attached
+            PUBLISHER.publish_birds(birds, pipes, score)
+        if render:
+            if RENDER_BEST and best_bird is not None:
+                shown = [best_bird] if best_bird in birds else []
+            else:
+                shown = birds
+            if painter is not None:
+                painter.draw(shown, pipes, base, score, GEN, [g.fitness for g in ge] if shown is birds else None)
+            else:
+                draw_window(win, shown, pipes, base, score, GEN)
+            if prof:
+                prof.lap("draw")
+        if prof:
+            prof.end_frame(alive, tests)
 
 
 
 
 
-def run(config_path):
-    #instantiate configurations
-    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
-                         neat.DefaultStagnation, config_path)
-    
-    p = neat.Population(config)     #generate a population
+def make_evaluator(config):     #pick the fitness function p.run gets: shared world in this process, a pool of workers, or remote workers
+    if COORDINATOR is not None:
+        evaluator = Coordinator(COORDINATOR, config, seed=COURSE_SEED, courses=COURSES)
+        print("Listening for workers on {}:{} (start them with `python distributed.py HOST:PORT`)".format(*evaluator.address[:2]))
+        return evaluator.evaluate, evaluator
+    if WORKERS <= 0:
+        return main, None
+
+    evaluator = ParallelEvaluator(WORKERS, eval_genome, config, seed=COURSE_SEED, courses=COURSES)
+    return evaluator.evaluate, evaluator
+
+
+
+class GenerationReporter(BaseReporter):     #keeps GEN on neat's generation even when main() doesn't run (all cache hits)
+    def start_generation(self, generation):
+        global GEN
+        GEN = generation        #main() counts this gen in, like it always has
+        self.generation = generation
+
+    def end_generation(self, config, population, species_set):
+        global GEN
+        GEN = self.generation + 1       #what main() would have left it at, for checkpoints
+
 
+
+def run_state():     #what the checkpoints need from this module to resume exactly
+    return {"GEN": GEN, "COURSE_SEED": COURSE_SEED, "COURSES": COURSES,
+            "BUDGET_BEST": BUDGET.best if BUDGET is not None else None}       #--budget's cutoff comes from the best fitness so far
+
+
+
+def run(config_path):
+    global GEN, COURSE_SEED, COURSES, PUBLISHER, BUDGET, DECIDER
+    state = checkpoint.load_latest(CHECKPOINT_DIR) if RESUME and CHECKPOINT_DIR is not None else None
+    extra = {}
+    if state is not None:
+        p, extra = checkpoint.restore(state)        #population, species, id counters + random state as they were
+        config = p.config
+        GEN, COURSE_SEED, COURSES = extra["GEN"], extra["COURSE_SEED"], extra["COURSES"]
+        print("Resuming from generation {}".format(p.generation))
+    else:
+        #instantiate configurations
+        config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                             neat.DefaultStagnation, config_path)
+
+        p = neat.Population(config)     #generate a population
+
+    p.add_reporter(GenerationReporter())        #before the Checkpointer, so checkpoints see this gen's GEN
     #gives stats as running
     p.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     p.add_reporter(stats)
+    if CHECKPOINT_DIR is not None:
+        p.add_reporter(checkpoint.Checkpointer(p, CHECKPOINT_DIR, every=CHECKPOINT_EVERY, keep=KEEP_CHECKPOINTS, extra=run_state))
 
     #run main as the fitness function, 50 times (for 50 generations)
     #need give main params of genomes, config
-    winner = p.run(main,50)
+    fitness_function, evaluator = make_evaluator(config)
+    if SPECTATE is not None:
+        PUBLISHER = Publisher(SPECTATE, capacity=config.pop_size)
+    if FITNESS_CACHE > 0:       #same genome on the same seeded course always gets the same fitness, so skip the repeats
+        cache = FitnessCache(FITNESS_CACHE)
+        fitness_function = CachedEvaluator(fitness_function, cache, course.course_seeds(COURSE_SEED, COURSES),
+                                           (DECIDE, DECIDE_EVERY, START_PIPE)).evaluate
+        p.add_reporter(CacheReporter(cache))
+    if PROFILER is not None:
+        p.add_reporter(ProfilerReporter(PROFILER))
+    if ADAPTIVE_BUDGET:
+        BUDGET = Budget(config)
+        BUDGET.best = extra.get("BUDGET_BEST")      #None on a fresh run (or a checkpoint from before it was saved)
+        p.add_reporter(BudgetReporter(BUDGET))
+    if DECIDE != "frame":
+        DECIDER = Decider(DECIDE, DECIDE_EVERY)
+        p.add_reporter(DecisionReporter(DECIDER))
+    try:
+        winner = p.run(fitness_function, max(0, GENERATIONS - p.generation))
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+        if PUBLISHER is not None:
+            PUBLISHER.close()
+            PUBLISHER = None
+
+    if CHECKPOINT_DIR is not None and winner is not None:
+        checkpoint.save_winner(os.path.join(CHECKPOINT_DIR, "winner.fbw"), winner, config)
+    if RECORD_DIR is not None and winner is not None:       #the winner alone on a course, to watch it fly
+        replay.record_genomes([(winner.key, winner)], config, gen_course_seeds()[0], os.path.join(RECORD_DIR, "winner.fbr"))
+    return winner
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a NEAT agent to play Flappy Bird")
+    parser.add_argument("--headless", action="store_true",
+                        help="don't open a window or limit the tick rate; train as fast as possible")
+    parser.add_argument("--render-every", type=int, default=0, metavar="N",
+                        help="with --headless, still draw every Nth generation (0 = never)")
+    parser.add_argument("--render-best", action="store_true",
+                        help="only draw the bird of last generation's best genome")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="evaluate genomes in a pool of N worker processes, each genome alone on a seeded course")
+    parser.add_argument("--coordinator", default=None, metavar="HOST:PORT",
+                        help="evaluate genomes on remote workers (`python distributed.py HOST:PORT`) instead of here")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="pipe course seed (default: a new course every generation)")
+    parser.add_argument("--courses", type=int, default=1, metavar="K",
+                        help="fly every genome on K seeded courses and use its mean fitness")
+    parser.add_argument("--course-cache", default=None, metavar="DIR",
+                        help="also cache courses on disk in DIR (memory-mapped), shared by workers and later runs")
+    parser.add_argument("--engine", choices=["objects", "numpy"], default="objects",
+                        help="numpy: headless gens step the whole population with array ops (for big populations)")
+    parser.add_argument("--fitness-cache", type=int, default=0, metavar="N",
+                        help="with --seed, remember the fitness of up to N genomes so elites/exact copies aren't flown again")
+    parser.add_argument("--checkpoint-dir", default=None, metavar="DIR",
+                        help="save a checkpoint every generation and the winner (winner.fbw) in DIR")
+    parser.add_argument("--checkpoint-every", type=int, default=1, metavar="N",
+                        help="checkpoint every Nth generation")
+    parser.add_argument("--keep-checkpoints", type=int, default=3, metavar="N",
+                        help="only keep the newest N checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="carry on from the newest checkpoint in --checkpoint-dir")
+    parser.add_argument("--renderer", choices=["classic", "fast"], default="classic",
+                        help="fast: dirty-rect renderer w/ cached HUD + batched blits, for watching big populations")
+    parser.add_argument("--top-n", type=int, default=0, metavar="N",
+                        help="with --renderer fast, only draw the N best birds plus an alive count")
+    parser.add_argument("--spectate", default=None, metavar="NAME",
+                        help="publish the world to shared memory so `python spectator.py NAME` can watch (not with --workers/--coordinator)")
+    parser.add_argument("--budget", action="store_true",
+                        help="cap episodes + race genomes over the courses, so decided genomes stop being simulated (not with --workers/--fitness-cache)")
+    parser.add_argument("--decide", choices=["frame", "interval", "event"], default="frame",
+                        help="when birds ask their network: every frame, every --decide-every frames, or on events (not with --workers)")
+    parser.add_argument("--decide-every", type=int, default=4, metavar="K",
+                        help="decision interval, or with --decide event the most frames between decisions")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="save a replay of every course of every gen + the winner in DIR; watch with `python gameNoAI.py FILE` (needs --headless, not with --workers)")
+    parser.add_argument("--start-pipe", type=int, default=0, metavar="N",
+                        help="start every episode just past pipe N from one saved world state, to train on the later part of the course (needs --engine numpy --headless --seed)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each phase of the frame loop and print a profile every generation (not with --workers/--coordinator)")
+    args = parser.parse_args()
+    if args.resume and args.checkpoint_dir is None:
+        parser.error("--resume needs --checkpoint-dir")
+    if args.fitness_cache > 0 and args.seed is None:
+        parser.error("--fitness-cache needs --seed (fitness only repeats on a fixed course)")
+    if args.coordinator is not None and args.workers > 0:
+        parser.error("use either --workers or --coordinator")
+    remote = args.workers > 0 or args.coordinator is not None
+    if args.budget and (remote or args.fitness_cache > 0):
+        parser.error("--budget doesn't work with --workers/--coordinator or --fitness-cache (budgeted fitness depends on the rest of the population)")
+    if args.spectate is not None and remote:
+        parser.error("--spectate doesn't work with --workers/--coordinator (the world lives in the worker processes)")
+    if args.profile and remote:
+        parser.error("--profile doesn't work with --workers/--coordinator (the frame loop runs in the worker processes)")
+    if args.decide != "frame" and remote:
+        parser.error("--decide doesn't work with --workers/--coordinator")
+    if args.record is not None and remote:
+        parser.error("--record doesn't work with --workers/--coordinator (genomes are flown in the worker processes)")
+    if args.record is not None and (not args.headless or args.render_every > 0):
+        parser.error("--record needs --headless w/o --render-every (drawn birds flap, which changes their collision mask; replays never flap)")
+    if args.start_pipe > 0 and (args.engine != "numpy" or not args.headless or args.render_every > 0 or args.seed is None):
+        parser.error("--start-pipe needs --engine numpy --headless --seed (snapshots are numpy world states of fixed courses)")
+    if args.start_pipe > 0 and (remote or args.record is not None):
+        parser.error("--start-pipe doesn't work with --workers/--coordinator or --record")
+
+    HEADLESS = args.headless
+    RENDER_EVERY = args.render_every
+    RENDER_BEST = args.render_best
+    WORKERS = args.workers
+    COORDINATOR = parse_address(args.coordinator) if args.coordinator is not None else None
+    COURSE_SEED = args.seed
+    ENGINE = args.engine
+    COURSES = max(1, args.courses)
+    FITNESS_CACHE = args.fitness_cache
+    course.set_cache_dir(args.course_cache)
+    CHECKPOINT_DIR = args.checkpoint_dir
+    CHECKPOINT_EVERY = max(1, args.checkpoint_every)
+    KEEP_CHECKPOINTS = max(1, args.keep_checkpoints)
+    RESUME = args.resume
+    RENDERER = args.renderer
+    SPECTATE = args.spectate
+    RECORD_DIR = args.record
+    ADAPTIVE_BUDGET = args.budget
+    DECIDE = args.decide
+    DECIDE_EVERY = max(1, args.decide_every)
+    START_PIPE = max(0, args.start_pipe)
+    if RECORD_DIR is not None:
+        os.makedirs(RECORD_DIR, exist_ok=True)
+    TOP_N = max(0, args.top_n)
+    if args.profile:
+        PROFILER = FrameProfiler()
+    if WORKERS > 0 or COORDINATOR is not None:
+        HEADLESS = True     #workers never draw
+    if HEADLESS and RENDER_EVERY <= 0:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")     #never touch a real display, so this works on boxes w/o one
+
     local_dir = os.path.dirname(__file__)       #path to dir we're in rn
     config_path = os.path.join(local_dir, "config-feedforward.txt")
-    run(config_path)
\ No newline at end of file
+    run(config_path)
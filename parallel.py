@@ -0,0 +1,56 @@
+import multiprocessing
+import random
+import course
+
+
+"""
+Parallel genome evaluation, a drop-in fitness function for p.run (like neat.ParallelEvaluator).
+
+Every genome flies alone on the same seeded pipe course(s), so its fitness is exactly what
+eval_func(genome, config, seeds) gives when called serially. The pool is made once and reused
+every generation, so each worker pays the pygame/neat import and image loading only once.
+Genomes are sent in chunks to cut down on round trips.
+"""
+
+
+_eval_func = None       #set once per worker process by _init_worker
+_config = None
+
+
+def _init_worker(eval_func, config):
+    global _eval_func, _config
+    _eval_func = eval_func
+    _config = config
+
+
+def _eval_chunk(args):      #runs in a worker; returns fitness for each genome in the chunk (same order)
+    seeds, chunk = args
+    return [_eval_func(g, _config, seeds) for g in chunk]
+
+
+class ParallelEvaluator:
+    def __init__(self, num_workers, eval_func, config, seed=None, courses=1, chunksize=None):
+        self.num_workers = num_workers
+        self.seed = seed            #None = draw a new course seed every gen
+        self.courses = courses      #courses per genome (see course.course_seeds)
+        self.chunksize = chunksize  #None = split each gen into ~4 chunks per worker
+        self.pool = multiprocessing.Pool(num_workers, initializer=_init_worker, initargs=(eval_func, config))
+
+    def evaluate(self, genomes, config):       #same signature as main.main, so p.run can call it
+        seed = self.seed if self.seed is not None else random.randrange(2**32)
+        seeds = course.course_seeds(seed, self.courses)
+        chunksize = self.chunksize or max(1, len(genomes) // (self.num_workers * 4))
+
+        chunks = []
+        for i in range(0, len(genomes), chunksize):
+            chunks.append((seeds, [g for _, g in genomes[i:i + chunksize]]))
+
+        #genomes get pickled over to the workers, so write the fitness back onto our own copies
+        results = self.pool.map(_eval_chunk, chunks)
+        fitnesses = [f for chunk in results for f in chunk]
+        for (_, g), fitness in zip(genomes, fitnesses):
+            g.fitness = fitness
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,109 @@
+import math
+import time
+from neat.reporting import BaseReporter
+
+
+"""
+Per-phase frame profiler for the main loop (main.play / world.World.step) + a NEAT reporter to print it.
+
+The loop calls prof.lap("phase") after each bit of work; the time since the last lap goes to that phase.
+At the end of a frame every phase's time for that frame goes into a histogram (power-of-2 microsecond
+buckets), along with counters: frames simulated, birds alive per frame, and bird-vs-pipe collision tests
+(pairs that get past the x broad phase, counted the same way by both engines).
+
+When profiling is off the loop holds None instead of a profiler, so the only cost is an `if prof:` check
+per phase per frame.
+
+Phases: tick (clock + events), move (Bird.move), activate (networks + jumps), collide (Pipe.collide),
+pipes (pipe bookkeeping), ground (ground/ceiling check), draw (draw_window + display.update)
+"""
+
+
+PHASES = ["tick", "move", "activate", "collide", "pipes", "ground", "draw"]
+BUCKETS = 24        #bucket i holds frames that took [2^(i-1), 2^i) microseconds in a phase (bucket 0 = under 1us)
+
+
+def _bucket(seconds):
+    us = seconds * 1e6
+    if us < 1:
+        return 0
+    return min(BUCKETS - 1, math.frexp(us)[1])
+
+
+class FrameProfiler:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.totals = {p: 0.0 for p in PHASES}
+        self.hists = {p: [0] * BUCKETS for p in PHASES}
+        self.frame = {p: 0.0 for p in PHASES}
+        self.frames = 0
+        self.birds_alive = 0        #summed over frames
+        self.collision_tests = 0
+        self.last = time.perf_counter()
+
+    def start_frame(self):
+        self.last = time.perf_counter()
+
+    def lap(self, phase):       #time since the last lap/start_frame counts towards phase
+        now = time.perf_counter()
+        self.frame[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self, alive, collision_tests=0):
+        frame = self.frame
+        for p in PHASES:
+            t = frame[p]
+            if t:
+                self.totals[p] += t
+                self.hists[p][_bucket(t)] += 1
+                frame[p] = 0.0
+        self.frames += 1
+        self.birds_alive += alive
+        self.collision_tests += collision_tests
+
+    def percentile(self, phase, q):      #upper edge (us) of the bucket holding the q-th fraction of frames
+        hist = self.hists[phase]
+        total = sum(hist)
+        if not total:
+            return 0.0
+        seen = 0
+        for i, n in enumerate(hist):
+            seen += n
+            if seen >= q * total:
+                return float(2 ** i)
+        return float(2 ** (BUCKETS - 1))
+
+    def summary(self):      #dict of this generation's numbers (also kept in ProfilerReporter.history)
+        return {
+            "frames": self.frames,
+            "mean_birds_alive": self.birds_alive / self.frames if self.frames else 0.0,
+            "collision_tests": self.collision_tests,
+            "phases": {p: {"total_s": self.totals[p],
+                           "p50_us": self.percentile(p, 0.5),
+                           "p99_us": self.percentile(p, 0.99),
+                           "histogram": list(self.hists[p])} for p in PHASES if self.totals[p]},
+        }
+
+
+class ProfilerReporter(BaseReporter):
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.history = []       #one summary() per generation
+
+    def start_generation(self, generation):
+        self.profiler.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        summary = self.profiler.summary()
+        self.history.append(summary)
+        if not summary["frames"]:
+            return
+
+        total = sum(p["total_s"] for p in summary["phases"].values()) or 1.0
+        print("Frame profile: {} frames, {:.1f} birds alive/frame, {} collision tests".format(
+            summary["frames"], summary["mean_birds_alive"], summary["collision_tests"]))
+        for name, p in summary["phases"].items():
+            print("   {:<9} {:9.1f} ms {:5.1f}%   p50 < {:.0f} us   p99 < {:.0f} us".format(
+                name, p["total_s"] * 1000, 100 * p["total_s"] / total, p["p50_us"], p["p99_us"]))
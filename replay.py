@@ -0,0 +1,227 @@
+import os
+import sys
+import struct
+import random
+import tempfile
+import numpy as np
+import neat
+import world
+import course
+
+
+"""
+Compact, deterministic replays of episodes (main.py --record DIR, watch with `python gameNoAI.py FILE`).
+
+The game is deterministic given the pipe course and which birds jump on which frame, so that's all a
+replay stores: the course seed, each bird's starting y, then one bit per bird per frame (jumped or not),
+packed 8 birds to a byte - about 4 bytes per bird per second of game at 30 FPS. No networks are needed
+to play it back; the jumps are fed through world.World, which has the same physics as main.play.
+
+    header      magic, version, birds, course seed, frames
+    start_y     float64 per bird
+    jumps       frames rows of ceil(birds / 8) bytes (np.packbits, bird 0 = high bit of byte 0)
+    fitness     float64 per bird, as recorded (playback is checked against it)
+    keys        int64 per bird, the genome ids
+
+Replay memory-maps the file, so a 10,000 bird replay only reads the rows that get played. Player plays
+it back for all or some of the birds; seeking re-simulates from the start headless, which takes
+milliseconds for a whole episode, and fast-forward is just more steps per drawn frame.
+
+`python replay.py FILE...` prints what's in each file and checks it plays back to the recorded fitness;
+with no files it records a random population and checks that instead.
+"""
+
+
+MAGIC = b"FBRP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHIQI")      #magic, version, birds, course seed, frames
+
+
+class Recorder:
+    def __init__(self, path, seed, n, start_y=None):
+        self.n = n
+        self.seed = seed
+        self.frames = 0
+        self.index = {}     #Bird -> bird number, for main.play (birds get popped from its lists as they die)
+        self.start_y = np.full(n, float(world.BIRD_Y)) if start_y is None else np.asarray(start_y, dtype=np.float64)
+        self.f = open(path, "wb")
+        self.f.write(_HEADER.pack(MAGIC, VERSION, n, seed, 0))      #frame count gets filled in by close()
+        self.f.write(self.start_y.astype("<f8").tobytes())
+
+    def frame(self, jumped):        #bool array of which birds jumped this frame
+        self.f.write(np.packbits(jumped).tobytes())
+        self.frames += 1
+
+    def policy(self, policy):       #wrap a world.World policy so every frame's jumps get recorded
+        def recorded(inputs, alive):
+            jump = np.asarray(policy(inputs, alive), dtype=bool)
+            self.frame(jump & alive)
+            return jump
+        return recorded
+
+    def track(self, birds):     #main.play: number the Bird objects before any of them die
+        self.index = {bird: i for i, bird in enumerate(birds)}
+
+    def frame_birds(self, jumped):      #main.play: list of the Bird objects that jumped this frame
+        mask = np.zeros(self.n, dtype=bool)
+        mask[[self.index[bird] for bird in jumped]] = True
+        self.frame(mask)
+
+    def close(self, fitness, keys=None):
+        keys = range(self.n) if keys is None else keys
+        self.f.write(np.asarray(fitness, dtype="<f8").tobytes())
+        self.f.write(np.asarray(keys, dtype="<i8").tobytes())
+        self.f.seek(0)
+        self.f.write(_HEADER.pack(MAGIC, VERSION, self.n, self.seed, self.frames))
+        self.f.close()
+
+
+class Replay:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("{} is too short to be a replay".format(path))
+        magic, version, n, seed, frames = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("{} is not a replay file".format(path))
+        if version != VERSION:
+            raise ValueError("{} is format version {}, this code reads version {}".format(path, version, VERSION))
+
+        self.path = path
+        self.n = n
+        self.seed = seed
+        self.frames = frames
+        self.row_bytes = (n + 7) // 8
+        pos = _HEADER.size
+        self.start_y = np.memmap(path, dtype="<f8", mode="r", offset=pos, shape=(n,))
+        pos += 8 * n
+        self.bits = np.memmap(path, dtype=np.uint8, mode="r", offset=pos, shape=(frames, self.row_bytes))
+        pos += frames * self.row_bytes
+        self.fitness = np.memmap(path, dtype="<f8", mode="r", offset=pos, shape=(n,))
+        self.keys = np.memmap(path, dtype="<i8", mode="r", offset=pos + 8 * n, shape=(n,))
+
+    def jumps(self, frame):     #bool array of which birds jumped on frame (0-based)
+        if frame >= self.frames:
+            return np.zeros(self.n, dtype=bool)
+        return np.unpackbits(self.bits[frame], count=self.n).astype(bool)
+
+    def birds_for(self, keys):      #bird numbers of these genome ids
+        where = {int(k): i for i, k in enumerate(self.keys)}
+        return [where[k] for k in keys]
+
+
+class Player:
+    def __init__(self, replay, birds=None):
+        self.replay = replay
+        self.birds = np.arange(replay.n) if birds is None else np.asarray(birds, dtype=np.int64)      #which birds to play back
+        self.restart()
+
+    def restart(self):
+        self.world = world.World(len(self.birds), course.heights(self.replay.seed))
+        self.world.y[:] = self.replay.start_y[self.birds]
+        self.world.height[:] = self.world.y
+        self.died = np.zeros(len(self.birds), dtype=np.int64)      #frame each bird died on (0 = hasn't)
+
+    @property
+    def frame(self):
+        return self.world.frames
+
+    @property
+    def done(self):     #the recording ends here even if birds are still alive (e.g. stopped at main.py --budget's cap)
+        return self.world.done or self.world.frames >= self.replay.frames
+
+    def _policy(self, inputs, alive):
+        return self.replay.jumps(self.world.frames - 1)[self.birds]     #step() counts the frame before asking
+
+    def step(self, frames=1):
+        w = self.world
+        for _ in range(frames):
+            if self.done:
+                break
+            alive = w.alive.copy()
+            w.step(self._policy)
+            self.died[alive & ~w.alive] = w.frames
+
+    def seek(self, frame):      #jump to frame (re-simulates from the start when going backwards)
+        if frame < self.world.frames:
+            self.restart()
+        self.step(max(0, frame - self.world.frames))
+
+    def death_frame(self):      #frame the last of our birds died on (or the last frame), without moving the player
+        probe = Player(self.replay, self.birds)
+        probe.step(self.replay.frames)
+        return int(probe.died.max()) or probe.frame
+
+
+def record_genomes(genomes, config, seed, path, cap=None):      #fly (genome_id, genome) pairs together on a seeded course and record it
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for _, g in genomes]
+    recorder = Recorder(path, seed, len(nets))
+    w = world.World(len(nets), course.heights(seed), cap=cap)
+    policy = recorder.policy(world.net_policy(nets))
+    while not w.done:
+        w.step(policy)
+    recorder.close(w.fitness, [gid for gid, _ in genomes])
+    return w.fitness
+
+
+def verify(path):       #number of birds whose played-back fitness doesn't match the recorded one
+    replay = Replay(path)
+    player = Player(replay)
+    player.step(replay.frames)
+    return int(np.count_nonzero(player.world.fitness != replay.fitness)) + (player.frame != replay.frames)
+
+
+def _self_test():       #record a random population on a fixed course, then check playback + seeking against it
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"))
+    random.seed(14)
+    p = neat.Population(config)
+    for g in p.population.values():
+        for _ in range(5):
+            g.mutate(config.genome_config)
+    path = os.path.join(tempfile.mkdtemp(), "test.fbr")
+    record_genomes(list(p.population.items()), config, 14, path)
+    bad = verify(path)
+
+    replay = Replay(path)
+    straight = Player(replay)
+    straight.step(replay.frames // 2)
+    seeking = Player(replay)
+    seeking.seek(replay.frames - 1)
+    seeking.seek(replay.frames // 2)
+    if not (np.array_equal(straight.world.y, seeking.world.y) and np.array_equal(straight.world.alive, seeking.world.alive)):
+        bad += 1
+
+    capped = os.path.join(os.path.dirname(path), "capped.fbr")      #stopped early w/ birds still alive, like --budget episodes
+    fitness = record_genomes(list(p.population.items()), config, 14, capped, cap=20.0)
+    replay = Replay(capped)
+    player = Player(replay)
+    while not player.done:      #how gameNoAI.watch plays it: until done, not for a number of frames
+        player.step()
+    if player.frame != replay.frames or not np.array_equal(player.world.fitness, fitness) or not player.world.alive.any():
+        bad += 1
+    if player.death_frame() > replay.frames:
+        bad += 1
+    return bad, path
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths:
+        bad, path = _self_test()
+        print("self test ({}): {} mismatches".format(path, bad))
+        sys.exit(1 if bad else 0)
+
+    failed = False
+    for path in paths:
+        replay = Replay(path)
+        seconds = replay.frames / 30
+        size = os.path.getsize(path)
+        bad = verify(path)
+        failed = failed or bad
+        print("{}: {} birds, {} frames ({:.1f} s), course seed {}, {} bytes ({:.1f} bytes/bird/s), best fitness {:.1f}, {}".format(
+            path, replay.n, replay.frames, seconds, replay.seed, size,
+            replay.row_bytes * replay.frames / max(1, replay.n) / max(seconds, 1e-9),
+            float(replay.fitness.max()) if replay.n else 0.0, "plays back exactly" if not bad else "{} MISMATCHES".format(bad)))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,202 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+
+"""
+Watch training from a separate process, so drawing never slows training down.
+
+Training (main.py --spectate NAME) runs headless and a Publisher copies the world state - bird y/tilt/
+alive, pipe x/heights, score, gen - into a small ring of slots in shared memory. A viewer
+(python spectator.py NAME) attaches whenever it likes and draws the newest slot at 30 FPS with the normal
+Bird/Pipe/Base draw code.
+
+The publisher never waits for anything: it doesn't know if a viewer is attached, it just overwrites the
+oldest slot (at most `rate` times a second, so it's cheap even when training runs at thousands of
+frames/sec). Each slot has a sequence number that is odd while being written (a seqlock), so the viewer
+can tell when it copied a half-written slot and just takes the next one instead - frames get dropped,
+training never gets held up.
+"""
+
+
+MAGIC = 0x464C4150          #"FLAP"
+MAX_PIPES = 8
+SLOTS = 4
+_HEADER = 4                 #int64s: magic, bird capacity, slots, latest sequence number
+_META = 8                   #int64s per slot: seq, birds, pipes, score, gen, frame, 2 spare
+_PUBLISHED = set()          #names of the feeds a Publisher in this process created (and will unlink)
+
+
+def _layout(capacity):      #byte offsets of each field inside a slot + total slot size
+    fields = [("meta", np.int64, _META), ("y", np.float32, capacity), ("tilt", np.float32, capacity),
+              ("alive", np.uint8, capacity), ("pipe_x", np.float32, MAX_PIPES), ("pipe_h", np.float32, MAX_PIPES)]
+    offsets = {}
+    pos = 0
+    for name, dtype, n in fields:
+        offsets[name] = (pos, dtype, n)
+        pos += np.dtype(dtype).itemsize * n
+        pos = (pos + 7) // 8 * 8
+    return offsets, pos
+
+
+class _Ring:        #numpy views onto the shared memory block
+    def __init__(self, shm, capacity, slots):
+        self.shm = shm
+        self.capacity = capacity
+        self.slots = slots
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        offsets, size = _layout(capacity)
+        self.views = []
+        for s in range(slots):
+            base = _HEADER * 8 + s * size
+            self.views.append({name: np.ndarray((n,), dtype=dtype, buffer=shm.buf, offset=base + off)
+                               for name, (off, dtype, n) in offsets.items()})
+
+
+def _attach(name):      #open a feed w/o this process's resource tracker unlinking it at exit; the publisher does that
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)     #registers it w/ the resource tracker, like create=True would
+    if os.name == "posix" and shm.name not in _PUBLISHED:       #same process as the publisher: leave its registration for unlink()
+        resource_tracker.unregister("/" + shm.name.lstrip("/"), "shared_memory")     #tracked w/ the leading slash .name leaves off
+    return shm
+
+
+class Publisher:
+    def __init__(self, name, capacity, rate=60):
+        offsets, size = _layout(capacity)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER * 8 + SLOTS * size)
+        _PUBLISHED.add(self.shm.name)
+        self.ring = _Ring(self.shm, capacity, SLOTS)
+        self.ring.header[:] = (MAGIC, capacity, SLOTS, 0)
+        self.interval = 1.0 / rate if rate else 0.0
+        self.last = 0.0
+        self.seq = 0
+        self.frame = 0
+        self.gen = 0        #main.py sets this every gen
+
+    def _due(self):
+        self.frame += 1
+        now = time.perf_counter()
+        if now - self.last < self.interval:
+            return False
+        self.last = now
+        return True
+
+    def _write(self, y, tilt, alive, pipes, score):
+        self.seq += 1
+        slot = self.ring.views[self.seq % SLOTS]
+        meta = slot["meta"]
+        n = min(len(y), self.ring.capacity)
+        pipes = pipes[:MAX_PIPES]
+
+        meta[0] = 2 * self.seq - 1      #odd = being written
+        slot["y"][:n] = y[:n]
+        slot["tilt"][:n] = tilt[:n]
+        slot["alive"][:n] = alive[:n]
+        slot["pipe_x"][:len(pipes)] = [p.x for p in pipes]
+        slot["pipe_h"][:len(pipes)] = [p.height for p in pipes]
+        meta[1:6] = (n, len(pipes), score, self.gen, self.frame)
+        meta[0] = 2 * self.seq          #even = done
+        self.ring.header[3] = self.seq
+
+    def publish_world(self, world):     #world.World (numpy engine)
+        if self._due():
+            self._write(world.y, world.tilt, world.alive, world.pipes, world.score)
+
+    def publish_birds(self, birds, pipes, score):       #main.play's Bird/Pipe objects (only alive birds are in the list)
+        if self._due():
+            self._write([b.y for b in birds], [b.tilt for b in birds], [1] * len(birds), pipes, score)
+
+    def close(self):
+        _PUBLISHED.discard(self.shm.name)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class Viewer:
+    def __init__(self, name):
+        self.shm = _attach(name)        #we only borrow it; the publisher unlinks it
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=self.shm.buf)
+        if header[0] != MAGIC:
+            raise ValueError("shared memory {!r} isn't a flappy bird spectator feed".format(name))
+        self.ring = _Ring(self.shm, int(header[1]), int(header[2]))
+        self.last_seq = 0
+
+    def latest(self):       #newest complete snapshot as a dict, or None if nothing new (never waits on the publisher)
+        seq = int(self.ring.header[3])
+        if seq == 0 or seq == self.last_seq:
+            return None
+        slot = self.ring.views[seq % self.ring.slots]
+        meta = slot["meta"]
+        before = int(meta[0])
+        if before % 2:      #being written right now; skip it, a newer one is coming
+            return None
+        n, n_pipes, score, gen, frame = (int(v) for v in meta[1:6])
+        snap = {"y": slot["y"][:n].copy(), "tilt": slot["tilt"][:n].copy(), "alive": slot["alive"][:n].astype(bool),
+                "pipe_x": slot["pipe_x"][:n_pipes].copy(), "pipe_h": slot["pipe_h"][:n_pipes].copy(),
+                "score": score, "gen": gen, "frame": frame}
+        if int(meta[0]) != before:      #overwritten while we copied it
+            return None
+        self.last_seq = before // 2
+        return snap
+
+    def close(self):
+        self.shm.close()
+
+
+def view(name):     #viewer window: draws the newest snapshot with main.py's draw code at 30 FPS
+    import pygame
+    import main
+
+    feed = Viewer(name)
+    win = pygame.display.set_mode((main.WIN_WIDTH, main.WIN_HEIGHT))
+    pygame.display.set_caption("Flappy Bird spectator - " + name)
+    clock = pygame.time.Clock()
+    base = main.Base(730)
+    birds = []
+    pipes = []
+    snap = None
+
+    while True:
+        clock.tick(30)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                feed.close()
+                pygame.quit()
+                return
+
+        new = feed.latest()
+        if new is not None:
+            snap = new
+            while len(birds) < len(snap["y"]):
+                birds.append(main.Bird(230, 350))
+            pipes = []
+            for x, h in zip(snap["pipe_x"], snap["pipe_h"]):
+                pipe = main.Pipe(iter([int(h)]))
+                pipe.x = float(x)
+                pipes.append(pipe)
+
+        shown = []
+        if snap is not None:
+            for bird, y, tilt, alive in zip(birds, snap["y"], snap["tilt"], snap["alive"]):
+                if alive:
+                    bird.y = float(y)
+                    bird.tilt = int(tilt)
+                    shown.append(bird)
+        base.move()
+        main.draw_window(win, shown, pipes, base, snap["score"] if snap else 0, snap["gen"] if snap else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a headless training run (started w/ main.py --spectate NAME)")
+    parser.add_argument("name", nargs="?", default="flappy", help="feed name given to main.py --spectate")
+    args = parser.parse_args()
+    try:
+        view(args.name)
+    except FileNotFoundError:
+        print("no training run is publishing {!r} (start one with main.py --headless --spectate {})".format(args.name, args.name))
+        sys.exit(1)
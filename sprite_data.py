@@ -0,0 +1,114 @@
+#Generated by `python assets.py --regenerate` from imgs/ (scaled 2x) - don't edit by hand
+#Sprite sizes + collision masks, so the simulation never has to load images
+
+SIZES = {
+    'bird1': (68, 48),
+    'bird2': (68, 48),
+    'bird3': (68, 48),
+    'pipe': (104, 640),
+    'pipe_top': (104, 640),
+    'base': (672, 224),
+    'bg': (576, 1024),
+}
+
+#per sprite: [(number of identical rows, ((x, run length), ...)), ...] from the top row down
+MASKS = {
+    'bird1': [
+        (3, ((24, 24),)),
+        (1, ((23, 26),)),
+        (1, ((17, 34),)),
+        (2, ((16, 36),)),
+        (1, ((15, 38),)),
+        (1, ((13, 42),)),
+        (2, ((12, 44),)),
+        (1, ((11, 46),)),
+        (1, ((5, 54),)),
+        (2, ((4, 56),)),
+        (1, ((3, 57),)),
+        (7, ((0, 60),)),
+        (1, ((0, 61),)),
+        (1, ((0, 63),)),
+        (2, ((0, 64),)),
+        (1, ((0, 65),)),
+        (1, ((3, 65),)),
+        (2, ((4, 64),)),
+        (1, ((5, 63),)),
+        (1, ((7, 58),)),
+        (6, ((8, 56),)),
+        (1, ((9, 54),)),
+        (1, ((11, 50),)),
+        (2, ((12, 48),)),
+        (1, ((13, 46),)),
+        (1, ((19, 22),)),
+        (3, ((20, 20),)),
+    ],
+    'bird2': [
+        (3, ((24, 24),)),
+        (1, ((23, 26),)),
+        (1, ((17, 34),)),
+        (2, ((16, 36),)),
+        (1, ((15, 38),)),
+        (1, ((13, 42),)),
+        (2, ((12, 44),)),
+        (1, ((11, 46),)),
+        (1, ((9, 50),)),
+        (2, ((8, 52),)),
+        (1, ((7, 53),)),
+        (1, ((5, 55),)),
+        (6, ((4, 56),)),
+        (1, ((3, 58),)),
+        (1, ((0, 63),)),
+        (2, ((0, 64),)),
+        (1, ((0, 65),)),
+        (4, ((0, 68),)),
+        (1, ((3, 62),)),
+        (2, ((4, 60),)),
+        (1, ((5, 59),)),
+        (1, ((7, 57),)),
+        (2, ((8, 56),)),
+        (1, ((9, 54),)),
+        (1, ((11, 50),)),
+        (2, ((12, 48),)),
+        (1, ((13, 46),)),
+        (1, ((19, 22),)),
+        (3, ((20, 20),)),
+    ],
+    'bird3': [
+        (3, ((24, 24),)),
+        (1, ((23, 26),)),
+        (1, ((17, 34),)),
+        (2, ((16, 36),)),
+        (1, ((15, 38),)),
+        (1, ((13, 42),)),
+        (2, ((12, 44),)),
+        (1, ((11, 46),)),
+        (1, ((9, 50),)),
+        (2, ((8, 52),)),
+        (1, ((7, 53),)),
+        (1, ((5, 55),)),
+        (6, ((4, 56),)),
+        (1, ((4, 57),)),
+        (1, ((4, 59),)),
+        (2, ((4, 60),)),
+        (1, ((3, 62),)),
+        (4, ((0, 68),)),
+        (1, ((0, 65),)),
+        (6, ((0, 64),)),
+        (1, ((0, 63),)),
+        (1, ((3, 58),)),
+        (2, ((4, 56),)),
+        (1, ((5, 54),)),
+        (1, ((19, 22),)),
+        (3, ((20, 20),)),
+    ],
+    'pipe': [
+        (48, ((0, 104),)),
+        (1, ((3, 98),)),
+        (591, ((4, 96),)),
+    ],
+    'pipe_top': [
+        (591, ((4, 96),)),
+        (1, ((3, 98),)),
+        (48, ((0, 104),)),
+    ],
+}
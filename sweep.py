@@ -0,0 +1,226 @@
+import io
+import os
+import sys
+import time
+import json
+import random
+import hashlib
+import sqlite3
+import argparse
+import itertools
+import contextlib
+import multiprocessing
+import neat
+from neat.reporting import BaseReporter
+
+
+"""
+Hyperparameter sweeps over config-feedforward.txt (python sweep.py NAME=VALUES ... --workers N).
+
+Each trial is one training run: config-feedforward.txt loaded into a neat.Config, the trial's values set
+on it in memory (no config files get written), then main.py's training loop run headless with the numpy
+engine on seeded courses. Trials run at the same time in a pool of processes, one trial per process.
+
+    python sweep.py pop_size=30,50,100 conn_add_prob=0.3,0.5 --seeds 3          #grid: every combination, 3 seeds each
+    python sweep.py compatibility_threshold=2:4 weight_mutate_power=0.2:1 --random 20      #20 random points (lo:hi ranges)
+
+Any parameter in the config's sections works (pop_size, compatibility_threshold, conn_add_prob,
+weight_mutate_power, max_stagnation, survival_threshold, ...). In random mode lo:hi picks uniformly (whole
+numbers if both ends are), and a comma list picks one of its values.
+
+A trial stops when the best genome reaches fitness_threshold (solved), after --generations, or early once
+its best fitness hasn't improved for --patience gens (hopeless). Every finished trial goes straight into
+a SQLite file (--db) w/ its params, seed, how it ended, gens to threshold and wall time. Trials are keyed
+by a hash of their params, seed and settings, so running the same sweep again (e.g. after ctrl-c) skips the ones
+already in the db and only runs the rest. --summary prints the table for what's in the db so far.
+"""
+
+
+SECTIONS = ["", "genome_config", "species_set_config", "stagnation_config", "reproduction_config"]        #where in a neat.Config parameters can live ("" = [NEAT])
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt")
+
+
+class Hopeless(Exception):      #raised out of p.run to stop a trial early
+    pass
+
+
+class PatienceReporter(BaseReporter):        #stops the run once the best fitness has gone `patience` gens w/o improving
+    def __init__(self, patience):
+        self.patience = patience
+        self.best = None
+        self.since = 0
+        self.generations = 0
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.generations += 1
+        if self.best is None or best_genome.fitness > self.best:
+            self.best = best_genome.fitness
+            self.since = 0
+        else:
+            self.since += 1
+        if self.patience and self.since >= self.patience and self.best < config.fitness_threshold:
+            raise Hopeless()
+
+
+def parse_value(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return {"True": True, "False": False}.get(text, text)
+
+
+def parse_space(specs):     #["pop_size=30,50", "conn_add_prob=0.2:0.8"] -> {name: list of values or (lo, hi)}
+    space = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError("parameters look like NAME=A,B,C or NAME=LO:HI, got {!r}".format(spec))
+        if ":" in values:
+            lo, hi = values.split(":", 1)
+            space[name] = (parse_value(lo), parse_value(hi))
+        else:
+            space[name] = [parse_value(v) for v in values.split(",")]
+    return space
+
+
+def grid(space):        #every combination of the values
+    names = sorted(space)
+    for values in itertools.product(*(list(space[n]) for n in names)):
+        yield dict(zip(names, values))
+
+
+def sample(space, n, seed=0):       #n random points, always the same ones for the same seed (so a rerun finds the same trials)
+    rng = random.Random(seed)
+    names = sorted(space)
+    for _ in range(n):
+        params = {}
+        for name in names:
+            values = space[name]
+            if isinstance(values, tuple):
+                lo, hi = values
+                params[name] = rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else round(rng.uniform(lo, hi), 6)
+            else:
+                params[name] = rng.choice(values)
+        yield params
+
+
+def make_config(params, path=CONFIG_PATH):      #neat.Config from the file w/ params set on it in memory
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, path)
+    for name, value in params.items():
+        for section in SECTIONS:
+            target = getattr(config, section) if section else config
+            if hasattr(target, name):
+                setattr(target, name, value)
+                break
+        else:
+            raise ValueError("{} isn't a parameter in {}".format(name, os.path.basename(path)))
+    return config
+
+
+def trial_id(params, seed, generations, patience, courses):       #same trial = same params, seed + settings that change how it ends
+    return hashlib.sha1(json.dumps([params, seed, generations, patience, courses], sort_keys=True).encode()).hexdigest()[:16]
+
+
+def run_trial(args):        #runs in a worker: train one config on seeded courses; returns the row for the db
+    params, seed, generations, patience, courses = args
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+
+    config = make_config(params)
+    main.HEADLESS, main.ENGINE, main.COURSE_SEED, main.COURSES, main.GEN = True, "numpy", seed, courses, 0
+    random.seed(seed)
+    start = time.perf_counter()
+    p = neat.Population(config)
+    patience_reporter = PatienceReporter(patience)
+    p.add_reporter(patience_reporter)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            p.run(main.main, generations)
+        status = "max_gens"
+    except Hopeless:
+        status = "hopeless"
+    except neat.CompleteExtinctionException:
+        status = "extinct"
+    best = patience_reporter.best
+    solved = best is not None and best >= config.fitness_threshold
+    if solved:
+        status = "solved"
+    return {"id": trial_id(*args), "params": json.dumps(params, sort_keys=True), "seed": seed, "status": status,
+            "generations": patience_reporter.generations, "solved_at": patience_reporter.generations if solved else None,
+            "best_fitness": best, "wall_time": time.perf_counter() - start}
+
+
+def open_db(path):
+    db = sqlite3.connect(path)
+    db.execute("""CREATE TABLE IF NOT EXISTS trials (
+                      id TEXT PRIMARY KEY, params TEXT, seed INTEGER, status TEXT, generations INTEGER,
+                      solved_at INTEGER, best_fitness REAL, wall_time REAL, finished REAL)""")
+    db.commit()
+    return db
+
+
+def sweep(points, seeds, db, workers=1, generations=50, patience=10, courses=1):       #run every (params, seed) not already in db; returns how many ran
+    done = {row[0] for row in db.execute("SELECT id FROM trials")}
+    todo = [(params, seed, generations, patience, courses) for params in points for seed in seeds
+            if trial_id(params, seed, generations, patience, courses) not in done]
+    total = len(points) * len(seeds)
+    print("{} trials, {} already done, running {} on {} workers".format(total, total - len(todo), len(todo), workers))
+    if not todo:
+        return 0
+    with multiprocessing.Pool(workers) as pool:
+        for i, row in enumerate(pool.imap_unordered(run_trial, todo), 1):
+            row["finished"] = time.time()
+            db.execute("INSERT OR REPLACE INTO trials VALUES (:id, :params, :seed, :status, :generations, :solved_at, "
+                       ":best_fitness, :wall_time, :finished)", row)
+            db.commit()     #every trial on disk as soon as it's done, so an interrupted sweep loses at most the ones running
+            print("[{}/{}] {} seed {}: {} after {} gens ({:.1f}s)".format(i, len(todo), row["params"], row["seed"],
+                                                                         row["status"], row["generations"], row["wall_time"]))
+    return len(todo)
+
+
+def summary(db):        #one row per set of params, best first: solve rate, then mean gens to threshold
+    rows = db.execute("""SELECT params, COUNT(*), SUM(status = 'solved'), AVG(solved_at), AVG(best_fitness), AVG(wall_time)
+                         FROM trials GROUP BY params""").fetchall()
+    rows.sort(key=lambda r: (-r[2] / r[1], r[3] if r[3] is not None else float("inf")))
+    print("{:>7} {:>10} {:>10} {:>9}  params".format("solved", "gens", "best fit", "wall s"))
+    for params, n, solved, solved_at, best, wall in rows:
+        print("{:>3}/{:<3} {:>10} {:>10.1f} {:>9.1f}  {}".format(
+            solved, n, "-" if solved_at is None else "{:.1f}".format(solved_at), best or 0.0, wall, params))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep over config-feedforward.txt")
+    parser.add_argument("params", nargs="*", help="NAME=A,B,C (values) or NAME=LO:HI (range, --random only)")
+    parser.add_argument("--random", type=int, default=0, metavar="N", help="N random points instead of the full grid")
+    parser.add_argument("--sample-seed", type=int, default=0, help="seed for picking the random points")
+    parser.add_argument("--seeds", type=int, default=1, metavar="K", help="run each point on K seeds (courses + neat's randomness)")
+    parser.add_argument("--seed", type=int, default=1, help="first of the K seeds")
+    parser.add_argument("--courses", type=int, default=1, metavar="K", help="courses per genome each gen (like main.py --courses)")
+    parser.add_argument("--generations", type=int, default=50, help="most gens per trial")
+    parser.add_argument("--patience", type=int, default=10, metavar="G",
+                        help="stop a trial once its best fitness hasn't improved for G gens (0 = never)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N")
+    parser.add_argument("--db", default="sweep.db", help="SQLite file results go in (and are resumed from)")
+    parser.add_argument("--summary", action="store_true", help="just print the results in --db")
+    args = parser.parse_args()
+
+    db = open_db(args.db)
+    if not args.summary:
+        if not args.params:
+            parser.error("give at least one NAME=VALUES to sweep (or --summary)")
+        try:
+            space = parse_space(args.params)
+            if not args.random and any(isinstance(v, tuple) for v in space.values()):
+                raise ValueError("LO:HI ranges need --random N (the grid needs a list of values)")
+            points = list(sample(space, args.random, args.sample_seed) if args.random else grid(space))
+            for params in points:
+                make_config(params)     #catch typos before starting any processes
+        except ValueError as e:
+            parser.error(str(e))
+        sweep(points, [args.seed + k for k in range(max(1, args.seeds))], db, max(1, args.workers),
+              args.generations, args.patience, max(1, args.courses))
+    summary(db)
+    db.close()
+    sys.exit(0)
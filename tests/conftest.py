@@ -0,0 +1,27 @@
+import os
+import sys
+import random
+import pytest
+import neat
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)        #the game's modules live at the top of the repo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")       #no window needed
+
+
+@pytest.fixture
+def config():
+    return neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                       os.path.join(ROOT, "config-feedforward.txt"))
+
+
+@pytest.fixture
+def mutated(config):        #a population of random genomes grown w/ hidden nodes + connections, so topologies differ
+    def make(seed, mutations=20):
+        random.seed(seed)
+        genomes = list(neat.Population(config).population.values())
+        for g in genomes:
+            for _ in range(random.randrange(mutations)):
+                g.mutate(config.genome_config)
+        return genomes
+    return make
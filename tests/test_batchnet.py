@@ -0,0 +1,47 @@
+import random
+import numpy as np
+import pytest
+import neat
+import course
+import export
+from batchnet import BatchNetwork, batch_policy, verify
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_feedforward(config, mutated, seed):
+    genomes = mutated(seed)
+    rng = random.Random(seed)
+    inputs = [(rng.uniform(0, 730), rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(100)]
+    max_diff, mismatches = verify(genomes, config, inputs)
+    assert max_diff < 1e-9
+    assert mismatches == 0
+
+
+def test_matches_feedforward_on_flown_inputs(config, mutated):     #inputs the birds actually see, not just uniform noise
+    genomes = mutated(3)
+    inputs = export.record_inputs(genomes, config, course.course_seeds(3, 2), limit=300)
+    max_diff, mismatches = verify(genomes, config, inputs)
+    assert max_diff < 1e-9
+    assert mismatches == 0
+
+
+def test_rows_match_full_pass(config, mutated):
+    batch_net = BatchNetwork.from_genomes(mutated(4, 40), config)
+    rng = np.random.default_rng(4)
+    for _ in range(20):
+        inputs = rng.uniform(0, 500, (batch_net.n, 3))
+        rows = rng.random(batch_net.n) < rng.random()
+        some = batch_net.activate(inputs[rows], rows)
+        assert np.array_equal(some, batch_net.activate(inputs)[rows])      #same sums in the same order: bit for bit
+
+
+def test_policy_only_answers_asked_birds(config, mutated):
+    genomes = mutated(5)
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    policy = batch_policy(BatchNetwork(nets))
+    rng = np.random.default_rng(5)
+    inputs = rng.uniform(0, 500, (len(nets), 3))
+    asked = rng.random(len(nets)) < 0.3
+    jump = policy(inputs, asked)
+    assert not jump[~asked].any()
+    assert list(jump[asked]) == [nets[b].activate(tuple(inputs[b]))[0] > 0.5 for b in np.flatnonzero(asked)]
@@ -0,0 +1,119 @@
+import io
+import random
+import contextlib
+import pytest
+import neat
+import engine
+import gameNoAI
+import main
+
+
+#recorded w/ the game as it was before engine.py (main.py's + gameNoAI.py's own Bird/Pipe/Base)
+FLIGHTS = {     #(profile, seed): what fly() returned
+    ("main", 18): ([352.0, 248.0, 215.0, 239.0, 418.0, 344.0, 266.0, 261.5, 257.0, 252.5], [25] * 10, 83611.0, [],
+                   [(120, 290), (480, 361)], (-312, 360)),
+    ("main", 19): ([352.0, 510.0, 255.5, 148.5, 472.5, 365.5, 153.5, 380.0, 225.5, 350.0], [25] * 10, 97532.5,
+                   [103, 104, 105, 106, 107], [(120, 241), (480, 217)], (-312, 360)),
+    ("gameNoAI", 18): ([351.5, 151.0, 187.0, 243.0, 134.0, 143.0, 199.0, 467.0, 463.0, 420.0], [25] * 7 + [-95, 25, 25],
+                       79974.0, [], [(-40, 378), (365, 269)], (-156, 516)),
+    ("gameNoAI", 19): ([351.5, 415.0, 451.0, 507.0, 220.0, 91.0, 147.0, 415.0, 471.0, 399.0], [25] * 7 + [-95, 25, 25],
+                       108143.0, [], [(-40, 441), (365, 306)], (-156, 516)),
+}
+FITNESS = {     #COURSES: fitness of each of mutated(18)'s genomes on COURSE_SEED 5, same for both engines
+    1: [2.2, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 322.6, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.2, 2.1,
+        2.2, 2.2, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.2, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 2.2],
+    3: [2.2, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 310.0, 2.1, 2.1, 2.1, 2.5, 2.1, 2.1, 2.1, 2.2, 2.1,
+        2.2, 2.2, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 2.1, 2.2, 2.1, 2.1, 2.2, 2.1, 2.1, 2.1, 2.1, 2.2, 2.2, 2.1, 2.1, 2.1, 2.1, 2.1, 2.2],
+}
+TRAINING = [11.952, 40.67, 66.04, 60.866, 128.976]      #mean fitness of each gen, 5 gens from random.seed(7) on COURSE_SEED 7
+
+
+def reference_move(bird, physics):      #Bird.move as it was before the tables
+    bird.tick_count += 1
+    d = bird.vel*bird.tick_count + physics.gravity*bird.tick_count**2
+    if d >= physics.terminal_vel:
+        d = physics.terminal_vel
+    if d < 0:
+        d -= 2
+    bird.y = bird.y + d
+    if d < 0 or bird.y < bird.height + 50:
+        if bird.tilt < physics.max_rotation:
+            bird.tilt = physics.max_rotation
+    else:
+        if bird.tilt > -90:
+            bird.tilt -= physics.rot_vel
+
+
+def fly(bird_cls, make_pipe, base_cls, seed, frames=300):      #one seeded bird flying an autopilot over random pipes; everything it touches along the way
+    random.seed(seed)
+    bird = bird_cls(230, 350)
+    pipes = [make_pipe()]
+    base = base_cls(730)
+    ys, tilts, hits = [], [], []
+    for frame in range(frames):
+        pipe = next(p for p in pipes if p.x + p.WIDTH > bird.x)
+        if bird.y > pipe.bottom - 90 and bird.tick_count > 3:
+            bird.jump()
+        bird.move()
+        for p in pipes:
+            if p.collide(bird):
+                hits.append(frame)
+            p.move()
+        if pipes[-1].x < 250:
+            pipes.append(make_pipe())
+        pipes = [p for p in pipes if p.x + p.WIDTH >= 0]
+        base.move()
+        ys.append(bird.y)
+        tilts.append(bird.tilt)
+    return ys[::30], tilts[::30], sum(ys), hits, [(p.x, p.height) for p in pipes], (base.x1, base.x2)
+
+
+@pytest.mark.parametrize("profile", sorted(engine.PROFILES))
+def test_tables_match_formulas(profile):
+    physics = engine.PROFILES[profile]
+    cls = type("Bird", (engine.Bird,), {"PHYSICS": physics})
+    rng = random.Random(18)
+    for _ in range(100):
+        y = rng.randrange(100, 600) + rng.choice([0, 0.5, 0.25])
+        new, old = cls(230, y), cls(230, y)
+        p_jump = rng.random() * 0.3
+        for _ in range(400):
+            if rng.random() < p_jump:
+                new.jump()
+                old.jump()
+            new.move()
+            reference_move(old, physics)
+            assert (new.y, new.tilt) == (old.y, old.tilt)
+
+
+@pytest.mark.parametrize("profile, seed", sorted(FLIGHTS))
+def test_flight_matches_baseline(profile, seed):
+    if profile == "main":       #what main.py flies
+        result = fly(engine.Bird, lambda: engine.Pipe(), engine.Base, seed)
+    else:
+        result = fly(gameNoAI.Bird, lambda: gameNoAI.Pipe(650), gameNoAI.Base, seed)
+    assert result == FLIGHTS[profile, seed]
+
+
+@pytest.mark.parametrize("engine_name", ["objects", "numpy"])
+@pytest.mark.parametrize("courses", sorted(FITNESS))
+def test_fitness_matches_baseline(config, mutated, monkeypatch, engine_name, courses):
+    genomes = mutated(18)
+    for name, value in [("HEADLESS", True), ("COURSE_SEED", 5), ("COURSES", courses), ("ENGINE", engine_name)]:
+        monkeypatch.setattr(main, name, value)
+    main.main([(g.key, g) for g in genomes], config)
+    assert [round(g.fitness, 6) for g in genomes] == FITNESS[courses]
+
+
+@pytest.mark.parametrize("engine_name", ["objects", "numpy"])
+def test_training_matches_baseline(config, monkeypatch, engine_name):
+    config.fitness_threshold = float("inf")
+    for name, value in [("HEADLESS", True), ("COURSE_SEED", 7), ("COURSES", 1), ("ENGINE", engine_name), ("GEN", 0)]:
+        monkeypatch.setattr(main, name, value)
+    random.seed(7)
+    p = neat.Population(config)
+    stats = neat.StatisticsReporter()
+    p.add_reporter(stats)
+    with contextlib.redirect_stdout(io.StringIO()):
+        p.run(main.main, len(TRAINING))
+    assert [round(m, 6) for m in stats.get_fitness_mean()] == TRAINING
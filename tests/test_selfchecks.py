@@ -0,0 +1,62 @@
+import pytest
+import assets
+import budget
+import collision
+import course
+import distributed
+import export
+import gameNoAI
+import replay
+import world
+
+
+#each module's own self check (what `python <module>.py` runs), so pytest covers them too
+
+
+@pytest.mark.parametrize("pipe", ["pipe", "pipe_top"])
+def test_collision_table_matches_masks(pipe):
+    bird_mask = collision.get_mask(assets.image("bird1"))
+    assert collision.verify(bird_mask, collision.get_mask(assets.image(pipe))) == 0
+
+
+def test_world_snapshots():
+    bad, nbytes, saved = world.verify()
+    assert bad == 0
+
+
+def test_sprite_data_matches_imgs():
+    assert assets.verify() == []
+
+
+def test_budget_cap_and_racing():
+    violations, unfinished, overlap, skipped = budget.verify()
+    assert violations == 0
+    assert unfinished == 0
+
+
+def test_replay_plays_back():
+    bad, path = replay._self_test()
+    assert bad == 0
+    assert replay.verify(path) == 0
+
+
+def test_export_matches_feedforward(config, mutated, tmp_path):
+    genomes = mutated(21, 30)
+    inputs = export.record_inputs(genomes, config, course.course_seeds(21, 2), limit=2000)
+    for g in genomes[:8]:
+        r = export.check(g, config, inputs, str(tmp_path))
+        assert r["python_mismatches"] == 0
+        assert r["numpy_decision_mismatches"] == 0
+
+
+def test_distributed_matches_serial():
+    bad, requeued, local = distributed.verify()
+    assert bad == 0
+
+
+def test_game_same_at_any_render_rate():
+    assert gameNoAI.verify() == 0
+
+
+def test_game_numpy_policies_fly_like_python():
+    assert gameNoAI.verify_policies() == 0
@@ -0,0 +1,357 @@
+import numpy as np
+import collision
+import assets
+import course
+import engine
+
+
+"""
+Vectorized (numpy) version of the world in main.play, for training populations of thousands of birds.
+
+Instead of one Bird object per bird, every bird's y, vel, tick_count, height and tilt live in numpy
+arrays, with an alive mask instead of popping from lists. Physics, ground/ceiling deaths, passing pipes
+and fitness (+0.1 per frame, +5 per pipe, -1 for hitting a pipe) are each one array op per frame,
+so a frame costs about the same for 50 birds or 50,000.
+
+The pipes on screen live in a PipeRing: a few fixed-size arrays used round-robin (oldest pipe first)
+instead of a list that gets appended to + .remove()d from. So the whole world is a handful of arrays
+plus a few counters, and snapshot() copies it into a read-only Snapshot (about 56 bytes a bird, plus
+~100 for the pipes and counters, so thousands fit in memory easily). restore(snap) puts a world back to
+exactly that frame, any number of times, and restore(snap, bird=i) gives every bird in a world bird i's
+state - a whole population can fan out from one shared prefix (play(start=snap)) instead of each
+genome flying the course from pipe 0. prefix(heights, pipes) flies a simple autopilot up to a pipe to
+make such a snapshot.
+
+Physics + fitness are the same as main.Bird / main.play (both read engine.PROFILES["main"], incl. its
+per-tick_count drop/tilt tables), so a genome gets the same fitness here as it
+would flying alone in main.play on the same course. There's no drawing - this is headless only.
+"""
+
+
+BIRD_X = 230            #all birds start at (230, 350) and never move sideways
+BIRD_Y = 350
+FLOOR = 730             #top of the base
+PHYSICS = engine.PROFILES["main"]      #same numbers as main.Bird / main.Pipe
+JUMP_VEL = PHYSICS.jump_vel
+GRAVITY = PHYSICS.gravity
+TERMINAL_VEL = PHYSICS.terminal_vel
+MAX_ROTATION = PHYSICS.max_rotation
+ROT_VEL = PHYSICS.rot_vel
+PIPE_VEL = PHYSICS.pipe_vel
+DROP = np.array(PHYSICS.drop)      #[jumped yet, tick_count] -> pixels moved that frame
+TILT = np.array(PHYSICS.tilt, dtype=float)
+LAST_TICK = PHYSICS.last
+PIPE_GAP = 200
+PIPE_START_X = 600
+MAX_SCORE = 50          #episode ends once score goes past this
+
+#only need the masks + sizes for collisions (precomputed, no imgs loaded); birds never get drawn here so they always use the first bird img
+BIRD_MASK = assets.mask("bird1")
+PIPE_TOP_MASK = assets.mask("pipe_top")
+PIPE_BOTTOM_MASK = assets.mask("pipe")
+BIRD_WIDTH, BIRD_HEIGHT = assets.size("bird1")
+PIPE_WIDTH, PIPE_HEIGHT = assets.size("pipe")
+PIPE_SLOTS = -(-(PIPE_START_X + PIPE_WIDTH + PIPE_VEL) // (PIPE_START_X - BIRD_X)) + 1        #most pipes on screen at once: a new one every time the newest passes the birds, gone once it's offscreen (+1 while one's being added)
+TOP_TABLE = collision.OverlapTable(BIRD_MASK, PIPE_TOP_MASK)        #narrow phase lookups, filled in lazily per dx
+BOTTOM_TABLE = collision.OverlapTable(BIRD_MASK, PIPE_BOTTOM_MASK)
+
+
+class WorldPipe:        #read-only copy of one pipe in the ring: just the numbers from main.Pipe, no images
+    def __init__(self, number, x, height, passed):
+        self.number = number        #which pipe of the course this is (0 = first)
+        self.x = x
+        self.height = height
+        self.top = height - PIPE_HEIGHT
+        self.bottom = height + PIPE_GAP
+        self.passed = passed
+
+
+class PipeRing:     #the pipes on screen, oldest first, in fixed-size arrays used round-robin
+    def __init__(self, slots=PIPE_SLOTS):
+        self.x = np.zeros(slots, dtype=np.int64)
+        self.height = np.zeros(slots, dtype=np.int64)
+        self.passed = np.zeros(slots, dtype=bool)
+        self.head = 0       #slot of the oldest pipe
+        self.count = 0
+        self.made = 0       #pipes made so far (= course number of the next one)
+
+    def slot(self, i):      #slot of the i-th pipe on screen
+        return (self.head + i) % len(self.x)
+
+    def push(self, height):     #new pipe at the right edge
+        if self.count == len(self.x):
+            raise RuntimeError("more than {} pipes on screen at once".format(len(self.x)))
+        s = self.slot(self.count)
+        self.x[s] = PIPE_START_X
+        self.height[s] = height
+        self.passed[s] = False
+        self.count += 1
+        self.made += 1
+
+    def pop(self):      #drop the oldest pipe
+        self.head = (self.head + 1) % len(self.x)
+        self.count -= 1
+
+    def view(self, i):
+        s = self.slot(i)
+        return WorldPipe(self.made - self.count + i, int(self.x[s]), int(self.height[s]), bool(self.passed[s]))
+
+
+class Snapshot:     #one frame of a World (or some of its birds), copied into read-only arrays
+    def __init__(self, world, birds=None):
+        idx = slice(None) if birds is None else np.asarray(birds, dtype=np.intp)
+        self.birds = np.stack([world.y[idx], world.vel[idx], world.tick_count[idx], world.height[idx],
+                               world.tilt[idx], world.fitness[idx], world.alive[idx]])      #float64 rows, one column per bird
+        ring = world.ring
+        self.pipes = np.stack([ring.x, ring.height, ring.passed])       #int64 rows, one column per ring slot
+        self.head, self.count, self.made = ring.head, ring.count, ring.made
+        self.score = world.score
+        self.frames = world.frames
+        self.done = world.done
+        self.base = (world.base.x1, world.base.x2)
+        self.birds.flags.writeable = False      #shared by every world restored from it, so nobody gets to change it
+        self.pipes.flags.writeable = False
+
+    def __len__(self):      #number of birds
+        return self.birds.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.birds.nbytes + self.pipes.nbytes
+
+
+class World:
+    def __init__(self, n, heights=None, profiler=None, publisher=None, cap=None, decider=None):
+        self.y = np.full(n, float(BIRD_Y))
+        self.vel = np.zeros(n)
+        self.tick_count = np.zeros(n, dtype=np.int64)
+        self.height = self.y.copy()
+        self.tilt = np.zeros(n)
+        self.alive = np.ones(n, dtype=bool)
+        self.fitness = np.zeros(n)
+
+        self.heights = heights if heights is not None else course.random_heights()
+        self.drawn = []         #course heights taken from heights so far, so restoring an earlier snapshot makes the same pipes again
+        self.ring = PipeRing()
+        self.ring.push(self.next_height())
+        self.base = engine.Base(FLOOR)
+        self.score = 0
+        self.frames = 0
+        self.done = n == 0
+        self.profiler = profiler        #profiler.FrameProfiler or None
+        self.publisher = publisher      #spectator.Publisher or None
+        self.decider = decider          #decisions.Decider (which birds ask their network this frame) or None = all of them
+        self.cap = cap                  #stop once the birds still alive have this much fitness (budget.py), None = play it out
+
+    @property
+    def pipes(self):        #the pipes on screen as WorldPipes, oldest first (for drawing + publishing; step() uses the ring)
+        return [self.ring.view(i) for i in range(self.ring.count)]
+
+    def next_height(self):      #height of the course's next pipe (same heights iterator as main.Pipe, so same seed -> same course)
+        while len(self.drawn) <= self.ring.made:
+            self.drawn.append(next(self.heights))
+        return self.drawn[self.ring.made]
+
+    def snapshot(self, birds=None):     #Snapshot of this frame; birds = only keep these birds (e.g. one to fan a population out from)
+        return Snapshot(self, birds)
+
+    def restore(self, snap, bird=None):     #go back to snap's frame (snap isn't changed); bird = every bird gets snapshot bird #bird's state
+        rows = snap.birds if bird is None else snap.birds[:, bird:bird + 1]
+        if rows.shape[1] not in (1, len(self.y)):
+            raise ValueError("snapshot has {} birds, this world has {}".format(rows.shape[1], len(self.y)))
+        self.y[:], self.vel[:], self.tick_count[:], self.height[:], self.tilt[:], self.fitness[:] = rows[:6]
+        self.alive[:] = rows[6] != 0
+        ring = self.ring
+        ring.x[:], ring.height[:] = snap.pipes[:2]
+        ring.passed[:] = snap.pipes[2] != 0
+        ring.head, ring.count, ring.made = snap.head, snap.count, snap.made
+        self.score = snap.score
+        self.frames = snap.frames
+        self.done = snap.done or not self.alive.any()
+        self.base.x1, self.base.x2 = snap.base
+
+    def move(self):     #Bird.move for every bird at once
+        self.tick_count += 1
+        t = np.minimum(self.tick_count, LAST_TICK)
+        jumped = (self.vel != 0).astype(np.intp)
+        self.y += DROP[jumped, t]
+        self.tilt = TILT[jumped, t]
+
+    def jump(self, mask):
+        self.vel[mask] = JUMP_VEL
+        self.tick_count[mask] = 0
+        self.height[mask] = self.y[mask]
+
+    def pipe_ind(self):     #index of the pipe just ahead of the birds
+        ring = self.ring
+        if ring.count > 1 and BIRD_X > ring.x[ring.head] + PIPE_WIDTH:
+            return 1
+        return 0
+
+    def inputs(self):       #network inputs for every bird: y, dist to top pipe, dist to bottom pipe
+        height = int(self.ring.height[self.ring.slot(self.pipe_ind())])
+        return np.stack([self.y, np.abs(self.y - height), np.abs(self.y - (height + PIPE_GAP))], axis=1)
+
+    def collide(self, x, height):       #alive birds that pixel-overlap the pipe at x w/ this height (same answer as main.Pipe.collide)
+        hit = np.zeros(len(self.y), dtype=bool)
+        dx = x - BIRD_X
+        if not collision.x_overlap(dx, BIRD_WIDTH, PIPE_WIDTH):      #broad phase: pipe isn't at the birds' column
+            return hit
+
+        idx = np.flatnonzero(self.alive)
+        y = np.rint(self.y[idx]).astype(np.int64)       #rint rounds half to even, same as round()
+        hit[idx] = TOP_TABLE.hits(dx, height - PIPE_HEIGHT - y) | BOTTOM_TABLE.hits(dx, height + PIPE_GAP - y)
+        return hit
+
+    def step(self, policy):     #one frame of main.play; policy(inputs, ask) -> bool array of which birds jump (only the ones in ask count)
+        if self.done:
+            return
+        self.frames += 1
+        prof = self.profiler
+        if prof:
+            prof.start_frame()
+            alive = int(np.count_nonzero(self.alive))
+
+        self.move()
+        self.fitness[self.alive] += 0.1
+        if prof:
+            prof.lap("move")
+        ask = self.alive if self.decider is None else self.decider.due_world(self)
+        self.jump(ask & policy(self.inputs(), ask))
+        if prof:
+            prof.lap("activate")
+
+        #Pipe management
+        ring = self.ring
+        add_pipe = False
+        gone = 0
+        tests = 0
+        for i in range(ring.count):
+            s = ring.slot(i)
+            x = int(ring.x[s])
+            any_alive = self.alive.any()
+            if prof:
+                prof.lap("pipes")
+                if collision.x_overlap(x - BIRD_X, BIRD_WIDTH, PIPE_WIDTH):
+                    tests += alive
+            hit = self.collide(x, int(ring.height[s]))
+            if prof:
+                prof.lap("collide")
+            self.fitness[hit] -= 1
+            self.alive[hit] = False
+
+            if any_alive and not ring.passed[s] and x < BIRD_X:
+                ring.passed[s] = True
+                add_pipe = True
+
+            if x + PIPE_WIDTH < 0:      #offscreen pipes are always the oldest ones
+                gone += 1
+            ring.x[s] = x - PIPE_VEL
+
+        if add_pipe:
+            self.score += 1
+            self.fitness[self.alive] += 5
+            ring.push(self.next_height())
+
+        for _ in range(gone):
+            ring.pop()
+        self.base.move()
+        if prof:
+            prof.lap("pipes")
+
+        #ground + top of screen
+        self.alive &= ~((self.y + BIRD_HEIGHT >= FLOOR) | (self.y < 0))
+        if prof:
+            prof.lap("ground")
+            prof.end_frame(alive, tests)
+
+        if not self.alive.any() or self.score > MAX_SCORE:
+            self.done = True
+        elif self.cap is not None and self.fitness[self.alive.argmax()] >= self.cap:     #alive birds all have the same fitness
+            self.done = True
+        if self.publisher is not None:
+            self.publisher.publish_world(self)
+
+
+def net_policy(nets):       #policy that asks each alive bird's own FeedForwardNetwork, one at a time
+    def policy(inputs, alive):
+        jump = np.zeros(len(nets), dtype=bool)
+        for i in np.flatnonzero(alive):
+            jump[i] = nets[i].activate(tuple(inputs[i]))[0] > 0.5
+        return jump
+    return policy
+
+
+def autopilot(world, offsets, waits):     #hand-made policy: flap once a bird is below the gap's bottom - its offset, at most every wait+1 frames
+    def policy(inputs, ask):
+        bottom = int(world.ring.height[world.ring.slot(world.pipe_ind())]) + PIPE_GAP
+        return (world.y > bottom - offsets) & (world.tick_count > waits)
+    return policy
+
+
+def prefix(heights, pipes):     #Snapshot of one bird just past pipe number pipes of the course, or None if no autopilot got that far
+    offsets = np.repeat(np.linspace(50, 130, 17), 3)        #a spread of autopilots; some of them get through any course tried so far
+    waits = np.tile([2, 3, 5], 17)
+    world = World(len(offsets), heights)
+    policy = autopilot(world, offsets, waits)
+    while not world.done and world.score < pipes:
+        world.step(policy)
+    if world.score < pipes or not world.alive.any():
+        return None
+    return world.snapshot([int(world.alive.argmax())])
+
+
+def play(nets, ge, heights=None, policy=None, profiler=None, publisher=None, cap=None, decider=None, start=None):     #numpy version of main.play (headless); adds fitness to the genomes in ge
+    world = World(len(ge), heights, profiler, publisher, cap, decider)
+    if start is not None:       #every bird starts from the snapshot's (first) bird, only fitness earned from there on counts
+        world.restore(start, bird=0 if len(start) == 1 else None)
+        world.fitness[:] = 0
+    if policy is None:
+        policy = net_policy(nets)
+
+    while not world.done:
+        world.step(policy)
+
+    for g, fitness in zip(ge, world.fitness):
+        g.fitness += float(fitness)
+    return world
+
+
+def verify(seed=19, pipes=20):      #(mismatches, bytes per 1-bird snapshot, frames saved per bird) for snapshot/restore + fan-out
+    rng = np.random.default_rng(seed)
+    n = 200
+    offsets, waits = rng.uniform(50, 130, n), rng.integers(2, 6, n)
+
+    def run(w, policy, frames=None):        #step to the end (or frames in)
+        while not w.done and (frames is None or w.frames < frames):
+            w.step(policy)
+        return w.fitness.copy(), w.frames
+
+    w = World(n, course.heights(seed))
+    policy = autopilot(w, offsets, waits)
+    run(w, policy, 300)
+    snap = w.snapshot()
+    full, frames = run(w, policy)
+    bad = 0
+    for target in (w, World(n, course.heights(seed))):      #the same world again, then a fresh one on the same course
+        target.restore(snap)
+        again, again_frames = run(target, autopilot(target, offsets, waits))
+        bad += int(np.count_nonzero(again != full)) + (again_frames != frames)
+
+    start = prefix(course.heights(seed), pipes)     #fan out: all birds together from the prefix == each one alone from it
+    together = World(n, course.heights(seed))
+    together.restore(start, bird=0)
+    fanned, _ = run(together, autopilot(together, offsets, waits))
+    for i in range(0, n, 10):
+        alone = World(1, course.heights(seed))
+        alone.restore(start)
+        fitness, _ = run(alone, autopilot(alone, offsets[i:i + 1], waits[i:i + 1]))
+        bad += fitness[0] != fanned[i]
+    return bad, start.nbytes, start.frames
+
+
+if __name__ == "__main__":
+    bad, nbytes, saved = verify()
+    print("snapshot/restore + fan-out: {} mismatches; a 1-bird snapshot is {} bytes, starting from it skips {} frames per bird".format(
+        bad, nbytes, saved))
+    raise SystemExit(1 if bad else 0)